@@ -48,19 +48,18 @@ class AnalyticsTasks(commands.Cog):
 
     @tasks.loop(seconds=60)
     async def send_info_to_db(self) -> None:
-        query = """
-            INSERT INTO analytics (event, user_id,  date_collected, args)
-            VALUES($1, $2, $3, $4);
-        """
+        # Events logged while the copy is in flight stay in the buffer for the next flush.
+        buffered = len(self.bot.analytics_buffer)
         rows: list[tuple[str, int, datetime.datetime, str]] = []
-        for raw_event, user_id, timestamp, args in self.bot.analytics_buffer:
+        for raw_event, user_id, timestamp, args in self.bot.analytics_buffer[:buffered]:
             log.debug(raw_event, user_id, timestamp, args)
             with contextlib.suppress(KeyError):
                 args.pop("screenshot")
             rows.append((raw_event, user_id, timestamp, json.dumps(args)))
         if rows:
-            await self.bot.database.set_many(query, rows)
-            self.bot.analytics_buffer = []
+            await self.bot.database.bulk_copy("analytics", ("event", "user_id", "date_collected", "args"), rows)
+            del self.bot.analytics_buffer[:buffered]
+            self.bot.command_catalog.add({row[0] for row in rows})
 
 
 async def setup(bot: Genji) -> None:
@@ -211,59 +211,8 @@ class Maps(commands.Cog):
         only_playtest: bool = False,
         view_filter: bool | None = None,
     ) -> list[database.DotRecord]:
-        _maps: list[database.DotRecord | None] = []
-        async for _map in itx.client.database.get(
-            """
-              WITH
-                completions AS (
-                    SELECT DISTINCT ON (map_code)
-                        map_code,
-                        record,
-                        verified,
-                        inserted_at
-                    FROM records
-                    WHERE user_id = $10 AND legacy IS FALSE
-                    ORDER BY map_code, inserted_at DESC
-                )
-            SELECT
-              am.map_name, map_type, am.map_code, am."desc", am.official,
-              am.archived, guide, mechanics, restrictions, am.checkpoints,
-              creators, difficulty, quality, creator_ids, am.gold, am.silver,
-              am.bronze, p.thread_id, pa.count, pa.required_votes,
-              c.map_code IS NOT NULL AS completed,
-              CASE
-                WHEN verified = TRUE AND c.record <= am.gold   THEN 'Gold'
-                WHEN verified = TRUE AND c.record <= am.silver THEN 'Silver'
-                WHEN verified = TRUE AND c.record <= am.bronze THEN 'Bronze'
-                                                               ELSE ''
-              END AS medal_type
-              FROM
-                all_maps am
-                  LEFT JOIN completions c ON am.map_code = c.map_code
-                  LEFT JOIN playtest p ON am.map_code = p.map_code AND p.is_author IS TRUE
-                  LEFT JOIN playtest_avgs pa ON pa.map_code = am.map_code
-             WHERE
-                 ($1::text IS NULL OR am.map_code = $1)
-             AND ($1::text IS NOT NULL OR ((archived = FALSE)
-               AND (official = $11::bool)
-               AND ($2::text IS NULL OR map_type LIKE $2)
-               AND ($3::text IS NULL OR map_name = $3)
-               AND ($4::text IS NULL OR mechanics LIKE $4)
-               AND ($13::text IS NULL OR restrictions LIKE $13)
-               AND ($5::numeric(10, 2) IS NULL OR $6::numeric(10, 2) IS NULL OR (difficulty >= $5::numeric(10, 2)
-                 AND difficulty < $6::numeric(10, 2)))
-               AND ($7::int IS NULL OR quality >= $7)
-               AND ($8::bigint IS NULL OR $8 = ANY (creator_ids))
-               AND ($12::bool IS FALSE OR (gold IS NOT NULL AND silver IS NOT NULL AND bronze IS NOT NULL))))
-             GROUP BY
-               am.map_name, map_type, am.map_code, am."desc", am.official, am.archived, guide, mechanics,
-               restrictions, am.checkpoints, creators, difficulty, quality, creator_ids, am.gold, am.silver,
-               am.bronze, c.map_code IS NOT NULL, c.record, verified, p.thread_id, pa.count, pa.required_votes
-            HAVING
-                ($9::bool IS NULL OR c.map_code IS NOT NULL = $9)
-            ORDER BY
-                difficulty, quality DESC;
-            """,
+        return await itx.client.database.fetch_named(
+            "map_search",
             map_code,
             utils.wrap_string_with_percent(map_type),
             map_name,
@@ -277,9 +226,8 @@ class Maps(commands.Cog):
             not only_playtest,
             only_maps_with_medals,
             utils.wrap_string_with_percent(restrictions),
-        ):
-            _maps.append(_map)
-        return _maps
+            readonly=True,
+        )
 
     @staticmethod
     def create_map_embeds(
@@ -338,13 +286,12 @@ class Maps(commands.Cog):
             raise errors.InvalidMapCodeError
 
         guides = [
-            x
-            async for x in itx.client.database.get(
+            x.url
+            for x in await itx.client.database.fetch(
                 "SELECT url FROM guides WHERE map_code=$1",
                 map_code,
             )
         ]
-        guides = [x.url for x in guides]
         if not guides:
             raise errors.NoGuidesExistError
 
@@ -428,21 +375,18 @@ class Maps(commands.Cog):
         quality: app_commands.Choice[int],
     ) -> None:
         await itx.response.defer(ephemeral=True)
-        if (
-            await itx.client.database.get_row(
-                "SELECT exists(SELECT 1 FROM map_creators WHERE map_code = $1 AND user_id = $2)",
-                map_code,
-                itx.user.id,
-            )
-        ).get("exists", None):
+        if await itx.client.database.fetchval(
+            "SELECT exists(SELECT 1 FROM map_creators WHERE map_code = $1 AND user_id = $2)",
+            map_code,
+            itx.user.id,
+        ):
             raise errors.CannotRateOwnMapError
 
-        row = await itx.client.database.get_row(
+        if not await itx.client.database.fetchval(
             "SELECT exists(SELECT 1 FROM records WHERE map_code = $1 AND user_id = $2)",
             map_code,
             itx.user.id,
-        )
-        if not row.exists:
+        ):
             raise errors.NoCompletionFoundError
 
         view = views.Confirm(itx)
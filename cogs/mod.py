@@ -54,7 +54,7 @@ class ModCommands(commands.Cog):
         await itx.response.defer(ephemeral=True)
 
         query = "SELECT url FROM guides WHERE map_code = $1;"
-        guides = [x.url async for x in itx.client.database.get(query, map_code)]
+        guides = [x.url for x in await itx.client.database.fetch(query, map_code)]
         if not guides:
             raise errors.NoGuidesExistError
 
@@ -164,7 +164,7 @@ class ModCommands(commands.Cog):
             )
         await itx.client.database.set(query, *args)
         await itx.edit_original_response(content=content)
-        if playtest := await itx.client.database.get_row(
+        if playtest := await itx.client.database.fetchrow(
             "SELECT thread_id, original_msg FROM playtest WHERE map_code=$1 AND original_msg IS NOT NULL",
             map_code,
         ):
@@ -331,6 +331,7 @@ class ModCommands(commands.Cog):
             record["inserted_at"],
         )
 
+        await itx.client.database.rank_summary.refresh_users([member.id])
         await member.send(f"Your record for {map_code} has been deleted by staff.")
         await utils.auto_skill_role(itx.client, itx.guild, member)
 
@@ -351,7 +352,8 @@ class ModCommands(commands.Cog):
         """
         old = await self.bot.database.fetch_nickname(member.id)
         query = "UPDATE users SET nickname = $1 WHERE user_id = $2;"
-        await self.bot.database.execute(query, nickname, member.id)
+        await self.bot.database.execute(query, nickname, member.id, user_ids=(member.id,))
+        self.bot.database.user_search.put(member.id, nickname)
         await itx.response.send_message(
             f"Changing {old} ({member}) nickname to {nickname}",
             ephemeral=True,
@@ -386,7 +388,8 @@ class ModCommands(commands.Cog):
         fake_user_id_query = "SELECT COALESCE(MAX(user_id) + 1, 1) FROM users WHERE user_id < 100000 LIMIT 1;"
         user_id = await self.bot.database.fetchval(fake_user_id_query)
         query = "INSERT INTO users (user_id, nickname) VALUES ($1, $2);"
-        await itx.client.database.execute(query, user_id, fake_user)
+        await itx.client.database.execute(query, user_id, fake_user, user_ids=(user_id,))
+        itx.client.database.user_search.put(user_id, fake_user)
 
     @mod.command(name="link-member")
     async def link_member(
@@ -412,7 +415,7 @@ class ModCommands(commands.Cog):
         fake_member_limit = 100000
         if _fake_user >= fake_member_limit:
             raise errors.InvalidFakeUserError
-        fake_name = await itx.client.database.get_row("SELECT * FROM users WHERE user_id=$1", _fake_user)
+        fake_name = await itx.client.database.fetchrow("SELECT * FROM users WHERE user_id=$1", _fake_user)
         if not fake_name:
             raise errors.InvalidFakeUserError
 
@@ -430,7 +433,7 @@ class ModCommands(commands.Cog):
     async def link_fake_to_member(itx: discord.Interaction[core.Genji], fake_id: int, member: discord.Member) -> None:
         await itx.client.database.execute("UPDATE map_creators SET user_id=$2 WHERE user_id=$1", fake_id, member.id)
         await itx.client.database.execute("UPDATE map_ratings SET user_id=$2 WHERE user_id=$1", fake_id, member.id)
-        await itx.client.database.execute("DELETE FROM users WHERE user_id=$1", fake_id)
+        await itx.client.database.execute("DELETE FROM users WHERE user_id=$1", fake_id, user_ids=(fake_id,))
 
     @mod.command(name="audit-log")
     async def audit_log(
@@ -448,21 +451,15 @@ class ModCommands(commands.Cog):
 
         """
         await itx.response.defer(ephemeral=True)
-        query = """
-            SELECT *
-            FROM analytics
-            WHERE $2::text IS NULL OR "event" = $2
-            ORDER BY date_collected DESC
-            LIMIT $1;
-        """
-        rows = await itx.client.database.fetch(query, limit, command_name)
+        if command_name:
+            rows = await itx.client.database.fetch_named("audit_log_event", limit, command_name, readonly=True)
+        else:
+            rows = await itx.client.database.fetch_named("audit_log", limit, readonly=True)
         if not rows:
             raise errors.NoAuditLogEntriesFoundError
         content = []
         for row in rows:
             command = row["event"]
-            if command in ["sync", "audit-log"] or command.startswith("jsk"):
-                continue
             timestamp = discord.utils.format_dt(row["date_collected"], style='F')
             assert itx.guild
             user = itx.guild.get_member(row["user_id"])
@@ -579,7 +576,7 @@ class ModCommands(commands.Cog):
             difficulty,
             map_code,
         )
-        if playtest := await itx.client.database.get_row(
+        if playtest := await itx.client.database.fetchrow(
             "SELECT thread_id, original_msg, message_id FROM playtest WHERE map_code=$1",
             map_code,
         ):
@@ -668,7 +665,7 @@ class ModCommands(commands.Cog):
         """
         await itx.response.defer(ephemeral=True)
 
-        options = await utils.db_records_to_options(self.bot.database, "map_type")
+        options = await self.bot.option_sets.get("map_type")
         select = {"map_type": views.MapTypeSelect(options)}
         view = views.Confirm(itx, proceeding_items=select, ephemeral=True)
         await itx.edit_original_response(
@@ -733,7 +730,7 @@ class ModCommands(commands.Cog):
         await itx.response.defer(ephemeral=True)
 
         preload_options = await self._preload_map_select_menu("mechanics", map_code)
-        options = await utils.db_records_to_options(self.bot.database, "mechanics")
+        options = await self.bot.option_sets.get("mechanics")
         for option in options:
             option.default = option.value in preload_options
 
@@ -796,7 +793,7 @@ class ModCommands(commands.Cog):
         """
         await itx.response.defer(ephemeral=True)
         preload_options = await self._preload_map_select_menu("restrictions", map_code)
-        options = await utils.db_records_to_options(self.bot.database, "restrictions")
+        options = await self.bot.option_sets.get("restrictions")
         for option in options:
             option.default = option.value in preload_options
 
@@ -884,7 +881,7 @@ class ModCommands(commands.Cog):
         )
         await itx.edit_original_response(content=f"Updated {map_code} checkpoint count to {checkpoint_count}.")
         # If playtesting
-        if playtest := await itx.client.database.get_row(
+        if playtest := await itx.client.database.fetchrow(
             "SELECT thread_id, original_msg FROM playtest WHERE map_code=$1", map_code
         ):
             itx.client.dispatch(
@@ -987,7 +984,7 @@ class ModCommands(commands.Cog):
         )
         await itx.edit_original_response(content=f"Updated {map_code} description to {description}.")
         # If playtesting
-        if playtest := await itx.client.database.get_row(
+        if playtest := await itx.client.database.fetchrow(
             "SELECT thread_id, original_msg FROM playtest WHERE map_code=$1", map_code
         ):
             itx.client.dispatch(
@@ -1033,7 +1030,7 @@ class ModCommands(commands.Cog):
         )
         await itx.edit_original_response(content=f"Updated {map_code} map name to {map_name}.")
         # If playtesting
-        if playtest := await itx.client.database.get_row(
+        if playtest := await itx.client.database.fetchrow(
             "SELECT thread_id, original_msg FROM playtest WHERE map_code=$1", map_code
         ):
             itx.client.dispatch(
@@ -1077,6 +1074,7 @@ class ModCommands(commands.Cog):
 
         await self._convert_records_to_legacy_completions(itx.client.database, map_code)
         await self._remove_map_medal_entries(map_code)
+        await itx.client.database.rank_summary.refresh_map(map_code)
 
         _data = {
             "map": {
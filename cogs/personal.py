@@ -19,8 +19,7 @@ class Personal(commands.Cog):
     async def settings(self, itx: discord.Interaction[core.Genji]) -> None:
         """Change various settings like notifications and your display name."""
         await itx.response.defer(ephemeral=True)
-        query = "SELECT flags FROM users WHERE user_id = $1;"
-        flags = await itx.client.database.fetchval(query, itx.user.id)
+        flags = await itx.client.database.fetch_user_flags(itx.user.id)
         view = views.SettingsView(itx, flags)
         await itx.edit_original_response(view=view)
 
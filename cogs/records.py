@@ -59,7 +59,7 @@ class Records(commands.Cog):
         if not user:
             user = itx.user
 
-        rows = await utils.fetch_user_rank_data(itx.client.database, user.id, True, False)
+        rows = await utils.fetch_user_rank_data(itx.client.database, user.id, True, False, readonly=True)
         description = ""
         for row in rows:
             description += (
@@ -279,7 +279,7 @@ class Records(commands.Cog):
         )
 
         await verification_msg.edit(view=v_view)
-        async with self.bot.database.pool.acquire() as conn, conn.transaction():
+        async with self.bot.database.transaction() as conn:
             try:
                 await self._insert_record_data(
                     map_code,
@@ -304,9 +304,10 @@ class Records(commands.Cog):
                 await channel_msg.delete()
                 await verification_msg.delete()
                 raise e
+        await self.bot.database.rank_summary.refresh_users([itx.user.id])
 
-    @staticmethod
     async def _insert_map_rating(
+        self,
         map_code: str,
         user_id: int,
         quality: int | None,
@@ -318,10 +319,10 @@ class Records(commands.Cog):
             VALUES ($1, $2, $3)
             ON CONFLICT (user_id, map_code) DO UPDATE SET quality=excluded.quality;
         """
-        await connection.execute(query, user_id, map_code, quality)
+        await self.bot.database.execute(query, user_id, map_code, quality, connection=connection)
 
-    @staticmethod
     async def _insert_record_data(
+        self,
         map_code: str,
         user_id: int,
         time: float,
@@ -340,7 +341,7 @@ class Records(commands.Cog):
             video, verified, message_id, channel_id, hidden_id, completion)
             VALUES ($1, $2, $3, $4, $5, FALSE, $6, $7, $8, $9)
         """
-        await connection.execute(
+        await self.bot.database.execute(
             query,
             map_code,
             user_id,
@@ -351,6 +352,7 @@ class Records(commands.Cog):
             channel_id,
             verification_id,
             completion,
+            connection=connection,
         )
 
     async def _check_for_global_multi_ban(self, map_code: str) -> None:
@@ -361,8 +363,7 @@ class Records(commands.Cog):
                 WHERE map_code = $1 AND restriction = 'Multi Climb'
             )
         """
-        check = await self.bot.database.get_row(query, map_code)
-        if not check.get("exists", True):
+        if not await self.bot.database.fetchval(query, map_code):
             raise errors.TemporaryMultiBanError
 
     async def _check_playtest(self, map_code: str) -> bool:
@@ -444,68 +445,9 @@ class Records(commands.Cog):
     ) -> list[models.Record]:
         if map_code and user_id:
             raise ValueError("Map code and user_id cannot be specified together.")
-        query = """
-            WITH map_creators_agg AS (
-                SELECT mc.map_code, array_agg(DISTINCT u.nickname) AS creators
-                FROM map_creators mc
-                LEFT JOIN users u ON mc.user_id = u.user_id
-                GROUP BY mc.map_code
-            ),
-            map_records AS (
-                SELECT
-                    u.nickname,
-                    r.user_id,
-                    record,
-                    screenshot,
-                    video,
-                    r.map_code,
-                    r.channel_id,
-                    r.message_id,
-                    m.map_name,
-                    avg(difficulty) as difficulty,
-                    rank() OVER (
-                        PARTITION BY r.map_code, r.user_id
-                        ORDER BY r.inserted_at DESC
-                    ) AS latest,
-                    gold,
-                    silver,
-                    bronze,
-                    r.verified,
-                    completion,
-                    creators
-                    FROM records r
-                        LEFT JOIN users u ON r.user_id = u.user_id
-                        LEFT JOIN maps m ON m.map_code = r.map_code
-                        LEFT JOIN map_ratings mr ON m.map_code = mr.map_code
-                        LEFT JOIN map_medals mm ON m.map_code = mm.map_code
-                        LEFT JOIN map_creators_agg mca ON mca.map_code = m.map_code
-                    WHERE mr.verified AND r.verified AND ($1::text IS NULL OR $1::text = r.map_code) AND NOT legacy
-                    GROUP BY u.nickname, record, screenshot, video, r.map_code,
-                        r.channel_id, r.message_id, m.map_name, gold, silver,
-                        bronze, inserted_at, r.user_id, r.verified, completion, r.user_id, creators
-            ), ranked_records AS (
-                SELECT
-                    *,
-                    RANK() OVER (PARTITION BY map_code ORDER BY completion, record) as rank_num
-                FROM map_records
-                WHERE map_records.latest = 1 AND (
-                    $1::text IS NULL OR (
-                        ($2::text != 'Fully Verified' OR (NOT completion AND video IS NOT NULL))
-                    AND ($2::text != 'Verified' OR (NOT completion AND NOT video IS NOT NULL))
-                    AND ($2::text != 'Completions' OR (completion))
-                    )
-                )
-                ORDER BY difficulty, map_code
-            )
-            SELECT * FROM ranked_records
-            WHERE $3::bigint IS NULL OR (
-                user_id=$3::bigint
-                    AND ($4::text != 'World Records' OR rank_num = 1 AND NOT completion AND video IS NOT NULL)
-                    AND ($4::text != 'Records' OR NOT completion)
-                    AND ($4::text != 'Completions' OR completion)
-            )
-        """
-        _records = await self.bot.database.fetch(query, map_code, lb_filters, user_id, pr_filters)
+        _records = await self.bot.database.fetch_named(
+            "leaderboard_records", map_code, lb_filters, user_id, pr_filters, readonly=True
+        )
         recs = [models.Record(**r) for r in _records]
         if not recs:
             raise errors.NoRecordsFoundError
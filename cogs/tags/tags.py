@@ -13,6 +13,8 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+from utils.autocomplete import dispatch_autocomplete
+
 from .tags_paginator import SimplePages
 
 if TYPE_CHECKING:
@@ -301,16 +303,19 @@ class Tags(commands.Cog):
 
     # These are hopefully fast enough. Through a query planner these take around ~20ms each.
 
+    @dispatch_autocomplete()
     async def non_aliased_tag_autocomplete(self, interaction: GenjiItx, current: str) -> list[app_commands.Choice[str]]:
         query = """SELECT name FROM tags WHERE location_id=$1 AND LOWER(name) % $2 LIMIT 12;"""
         results: list[tuple[str]] = await self.bot.database.pool.fetch(query, interaction.guild_id, current.lower())
         return [app_commands.Choice(name=a, value=a) for (a,) in results]
 
+    @dispatch_autocomplete()
     async def aliased_tag_autocomplete(self, interaction: GenjiItx, current: str) -> list[app_commands.Choice[str]]:
         query = """SELECT name FROM tag_lookup WHERE location_id=$1 AND LOWER(name) % $2 LIMIT 12;"""
         results: list[tuple[str]] = await self.bot.database.pool.fetch(query, interaction.guild_id, current.lower())
         return [app_commands.Choice(name=a, value=a) for (a,) in results]
 
+    @dispatch_autocomplete(per_user=True)
     async def owned_non_aliased_tag_autocomplete(
         self, interaction: GenjiItx, current: str
     ) -> list[app_commands.Choice[str]]:
@@ -325,6 +330,7 @@ class Tags(commands.Cog):
         )
         return [app_commands.Choice(name=a, value=a) for (a,) in results]
 
+    @dispatch_autocomplete(per_user=True)
     async def owned_aliased_tag_autocomplete(
         self, interaction: GenjiItx, current: str
     ) -> list[app_commands.Choice[str]]:
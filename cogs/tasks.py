@@ -27,15 +27,14 @@ class Tasks(commands.Cog):
     async def _update_global_names(self) -> None:
         await self.bot.wait_until_ready()
         global_names = [(u.id, u.name) for u in self.bot.users if u.global_name is not None]
-        query = """
-            INSERT INTO user_global_names (user_id, global_name)
-            VALUES ($1, $2)
-            ON CONFLICT (user_id) DO UPDATE
-            SET global_name = excluded.global_name
-            WHERE user_global_names.global_name != excluded.global_name
-        """
         log.debug("Updating global names...")
-        await self.bot.database.executemany(query, global_names)
+        await self.bot.database.bulk_copy(
+            "user_global_names",
+            ("user_id", "global_name"),
+            global_names,
+            conflict=("user_id",),
+            update=("global_name",),
+        )
 
     @tasks.loop(time=[datetime.time(0, 0, 0), datetime.time(12, 0, 0)])
     async def _playtest_auto_approve(self) -> None:
@@ -68,7 +67,7 @@ class Tasks(commands.Cog):
        date < now() - INTERVAL '4 weeks' and approved = FALSE
             """
         map_codes = []
-        async for row in self.bot.database.get(query):
+        for row in await self.bot.database.fetch(query):
             thread = self.bot.get_guild(constants.GUILD_ID).get_thread(row.thread_id)
             message = thread.get_partial_message(row.message_id)
             await self.bot.playtest_views[row.message_id].toggle_finalize_button(thread, message, True)
@@ -108,7 +107,7 @@ class Tasks(commands.Cog):
              WHERE
                date < now() - INTERVAL '4 weeks'
         """
-        async for row in self.bot.database.get(query):
+        for row in await self.bot.database.fetch(query):
             await self.bot.playtest_views[row.message_id].time_limit_deletion()
             self.bot.playtest_views.pop(row.message_id)
 
@@ -145,7 +144,7 @@ class Tasks(commands.Cog):
         guild = self.bot.get_guild(constants.GUILD_ID)
         map_codes = []
         rows = await self.bot.database.fetch(query)
-        async for row in rows:
+        for row in rows:
             assert guild
             creator = guild.get_member(row["user_id"])
             if not creator:
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import operator
+import time
 import typing
 from collections import defaultdict
 
 import discord
+import msgspec
 from discord.ext import commands
 
+from database import export
+from utils import models, rank_engine, utils
+from utils.skill_roles import SkillRoleSync
+
 if typing.TYPE_CHECKING:
     import core
 
@@ -15,6 +23,9 @@ log = logging.getLogger(__name__)
 
 
 class Test(commands.Cog):
+    _skill_role_sync: SkillRoleSync | None = None
+    _skill_role_sync_task: asyncio.Task[None] | None = None
+
     @commands.command()
     @commands.guild_only()
     @commands.is_owner()
@@ -222,6 +233,198 @@ class Test(commands.Cog):
         log.setLevel(level.upper())
         await ctx.message.delete()
 
+    @commands.command()
+    @commands.is_owner()
+    async def dbstats(
+        self,
+        ctx: commands.Context[core.Genji],
+        limit: int = 10,
+        sort: typing.Literal["total", "mean", "max", "calls", "rows"] = "total",
+    ) -> None:
+        """Show the top N queries by latency.
+
+        ?dbstats -> top 10 queries by total time
+        ?dbstats 5 max -> top 5 queries by worst latency
+        """
+        metrics = ctx.bot.database.metrics
+        acquire = metrics.acquire
+        cache = ctx.bot.database.cache
+        lines = [
+            f"since {metrics.started_at:%Y-%m-%d %H:%M:%S} UTC, sorted by {sort}",
+            f"pool.acquire  n={acquire.calls} p50={acquire.percentile(50) * 1000:.1f}ms "
+            f"p95={acquire.percentile(95) * 1000:.1f}ms max={acquire.max * 1000:.1f}ms",
+            f"cache  entries={len(cache)} size={cache.size / 1024:.0f}KiB hits={cache.hits} "
+            f"misses={cache.misses} evictions={cache.evictions}",
+            "",
+        ]
+        for stats in metrics.top(limit, key=sort):
+            lines.append(
+                f"{stats.name}\n"
+                f"  n={stats.calls} err={stats.failures} p50={stats.percentile(50) * 1000:.1f}ms "
+                f"p95={stats.percentile(95) * 1000:.1f}ms max={stats.max * 1000:.1f}ms "
+                f"total={stats.total:.2f}s rows={stats.mean_rows:.1f}"
+            )
+        body = "\n".join(lines)[:1900]
+        await ctx.send(f"```\n{body}\n```")
+
+    @commands.command()
+    @commands.is_owner()
+    async def dbslow(self, ctx: commands.Context[core.Genji], limit: int = 10) -> None:
+        """Show the most recent slow queries with redacted arguments."""
+        slow = list(ctx.bot.database.metrics.slow_queries)[-limit:]
+        if not slow:
+            await ctx.send("No slow queries recorded.")
+            return
+        lines = [
+            f"{q.timestamp:%H:%M:%S} {q.elapsed * 1000:.1f}ms rows={q.rows} {q.name} args={', '.join(q.args)}"
+            for q in reversed(slow)
+        ]
+        body = "\n".join(lines)[:1900]
+        await ctx.send(f"```\n{body}\n```")
+
+    @commands.command()
+    @commands.is_owner()
+    async def dbpool(self, ctx: commands.Context[core.Genji]) -> None:
+        """Show connection pool usage and acquire latency."""
+        stats = ctx.bot.database.pool_stats()
+        await ctx.send(
+            "```\n"
+            f"size={stats.size} (min {stats.min_size}, max {stats.max_size})\n"
+            f"in_use={stats.in_use} idle={stats.idle} waiters={stats.waiters}\n"
+            f"acquire p50={stats.acquire_p50 * 1000:.1f}ms p95={stats.acquire_p95 * 1000:.1f}ms "
+            f"max={stats.acquire_max * 1000:.1f}ms timeouts={stats.acquire_timeouts}\n"
+            "```"
+        )
+
+    @commands.command()
+    @commands.is_owner()
+    async def recordbench(self, ctx: commands.Context[core.Genji], rows: int = 5000, rounds: int = 5) -> None:
+        """Compare DotRecord attribute access against msgspec.convert on a map search.
+
+        ?recordbench -> 5,000 rows, best of 5
+        """
+        records = await ctx.bot.database.fetch_named(
+            "map_search", None, None, None, None, None, None, None, None, None, ctx.author.id, True, False, None
+        )
+        if not records:
+            await ctx.send("Map search returned no rows.")
+            return
+        records = (records * (rows // len(records) + 1))[:rows]
+        read_all = operator.attrgetter(*models.MapSearchResult.__struct_fields__)
+
+        def _dot_record() -> None:
+            for record in records:
+                read_all(record)
+
+        def _convert() -> None:
+            for struct in msgspec.convert(records, list[models.MapSearchResult], strict=False):
+                read_all(struct)
+
+        def _best(func: typing.Callable[[], None]) -> float:
+            timings = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        dot_record = await asyncio.to_thread(_best, _dot_record)
+        convert = await asyncio.to_thread(_best, _convert)
+        await ctx.send(
+            f"```\n{len(records)} rows, {len(models.MapSearchResult.__struct_fields__)} fields, best of {rounds}\n"
+            f"DotRecord attribute access  {dot_record * 1000:.2f}ms\n"
+            f"msgspec.convert + access    {convert * 1000:.2f}ms\n```"
+        )
+
+    @commands.command()
+    @commands.is_owner()
+    async def rankbench(self, ctx: commands.Context[core.Genji], sample: int = 200, rounds: int = 5) -> None:
+        """Time the rank engine over every record and check it against the rank SQL.
+
+        ?rankbench -> compare 200 users, best of 5
+        """
+        start = time.perf_counter()
+        snapshot = await rank_engine.RecordSnapshot.load(ctx.bot.database)
+        load = time.perf_counter() - start
+
+        def _best() -> tuple[float, rank_engine.RankTable]:
+            timings = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                table = rank_engine.RankTable.compute(snapshot)
+                timings.append(time.perf_counter() - start)
+            return min(timings), table
+
+        compute, table = await asyncio.to_thread(_best)
+        user_ids = table.user_ids[:: max(len(table.user_ids) // sample, 1)][:sample].tolist()
+        start = time.perf_counter()
+        expected = await utils.fetch_users_rank_data(ctx.bot.database, user_ids, True)
+        sql = time.perf_counter() - start
+        actual = table.details(user_ids)
+        mismatched = [user_id for user_id in user_ids if actual[user_id] != expected[user_id]]
+        await ctx.send(
+            f"```\n{len(snapshot)} records, {len(table.user_ids)} users\n"
+            f"snapshot load   {load * 1000:.0f}ms\n"
+            f"engine compute  {compute * 1000:.2f}ms (all users, best of {rounds})\n"
+            f"rank SQL        {sql * 1000:.0f}ms ({len(user_ids)} users)\n"
+            f"mismatched users {len(mismatched)}/{len(user_ids)} {mismatched[:5]}\n```"
+        )
+
+    @commands.command()
+    @commands.is_owner()
+    async def rankrebuild(self, ctx: commands.Context[core.Genji]) -> None:
+        """Recompute the rank summary for every user and report how many were out of date."""
+        async with ctx.typing():
+            start = time.perf_counter()
+            changed = await ctx.bot.database.rank_summary.rebuild()
+        await ctx.send(f"Rank summary rebuilt in {time.perf_counter() - start:.2f}s, {changed} users were out of date.")
+
+    @commands.command()
+    @commands.guild_only()
+    @commands.is_owner()
+    async def skillsync(
+        self,
+        ctx: commands.Context[core.Genji],
+        mode: typing.Literal["dry", "run", "restart", "status", "cancel"] = "status",
+    ) -> None:
+        """Bring every member's skill roles in line with their ranks.
+
+        ?skillsync dry -> count what would change without editing anyone
+        ?skillsync run -> apply the changes, resuming an unfinished run
+        ?skillsync restart -> apply the changes, starting over from the first member
+        ?skillsync status -> show the progress of the current or last run
+        ?skillsync cancel -> stop the current run, it can be resumed later
+        """
+        running = self._skill_role_sync_task is not None and not self._skill_role_sync_task.done()
+        if mode == "status":
+            await ctx.send(f"```\n{self._skill_role_sync.progress() if self._skill_role_sync else 'No runs yet.'}\n```")
+            return
+        if mode == "cancel":
+            if running:
+                self._skill_role_sync_task.cancel()
+            await ctx.send("Cancelled." if running else "Nothing is running.")
+            return
+        if running:
+            await ctx.send("A skill role sync is already running.")
+            return
+
+        self._skill_role_sync = job = SkillRoleSync(ctx.bot, ctx.guild, dry_run=mode == "dry")
+        self._skill_role_sync_task = task = asyncio.create_task(job.run(resume=mode != "restart"))
+        message = await ctx.send("```\nStarting...\n```")
+        while not task.done():
+            await asyncio.wait((task,), timeout=15)
+            await message.edit(content=f"```\n{job.progress()}\n```")
+        if not task.cancelled() and (exc := task.exception()) is not None:
+            await ctx.send(f"Skill role sync failed: {exc!r}")
+            raise exc
+
+    @commands.command()
+    @commands.is_owner()
+    async def dbreset(self, ctx: commands.Context[core.Genji]) -> None:
+        """Clear collected query stats and the slow-query log."""
+        ctx.bot.database.metrics.reset()
+        await ctx.message.add_reaction("✅")
+
     @commands.command()
     @commands.is_owner()
     async def close(
@@ -252,8 +455,15 @@ class Test(commands.Cog):
 
     @commands.command()
     @commands.cooldown(rate=1, per=100000, type=commands.BucketType.guild)
-    async def download_maps(self, ctx: commands.Context[core.Genji]) -> None:
-        f = await ctx.bot.database.copy_from_query(
+    async def download_maps(self, ctx: commands.Context[core.Genji], fmt: export.ExportFormat = "csv") -> None:
+        """Export all maps as gzip compressed CSV or JSONL, split into parts if needed.
+
+        ?download_maps -> CSV
+        ?download_maps jsonl -> JSON lines
+        """
+        limit = ctx.guild.filesize_limit if ctx.guild else discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES
+        async with export.export_query(
+            ctx.bot.database,
             """WITH
                 required      AS (
                   SELECT
@@ -325,10 +535,14 @@ class Test(commands.Cog):
              GROUP BY
                am.map_code,
                creator_ids
-             """
-        )
-
-        await ctx.send(file=discord.File(fp=f, filename="test.csv"))
+             """,
+            fmt=fmt,
+            filename="maps",
+            max_part_size=limit,
+        ) as parts:
+            for i, part in enumerate(parts, start=1):
+                content = f"Part {i}/{len(parts)}" if len(parts) > 1 else None
+                await ctx.send(content, file=discord.File(part, filename=part.name))
 
 
 async def setup(bot: core.Genji) -> None:
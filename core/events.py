@@ -142,12 +142,17 @@ class BotEvents(commands.Cog):
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member) -> None:
         # Add user to DB
-        with contextlib.suppress(asyncpg.UniqueViolationError):
+        try:
             await self.bot.database.set(
                 "INSERT INTO users VALUES ($1, $2, true);",
                 member.id,
                 member.name[:25],
+                user_ids=(member.id,),
             )
+        except asyncpg.UniqueViolationError:
+            pass
+        else:
+            self.bot.database.user_search.put(member.id, member.name[:25])
 
         log.debug(f"Adding user to database: {member.name}: {member.id}")
         query = """
@@ -169,6 +174,27 @@ class BotEvents(commands.Cog):
 
         await utils.auto_skill_role(self.bot, member.guild, member)
 
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild) -> None:
+        # Reconnects can replace every Role object.
+        self.bot.role_index.rebuild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        self.bot.role_index.forget(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role) -> None:
+        self.bot.role_index.rebuild(role.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role) -> None:
+        self.bot.role_index.rebuild(after.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role) -> None:
+        self.bot.role_index.rebuild(role.guild)
+
     @commands.Cog.listener()
     async def on_newsfeed_role(self, client: Genji, user: discord.Member, roles: list[discord.Role]) -> None:
         nickname = await client.database.fetch_nickname(user.id)
@@ -209,7 +235,7 @@ class BotEvents(commands.Cog):
         )
         if thread_id:
             thread = itx.guild.get_thread(thread_id)
-            row = await self.bot.database.get_row(
+            row = await self.bot.database.fetchrow(
                 """
                   SELECT
                     map_name,
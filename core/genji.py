@@ -8,8 +8,12 @@ import discord
 from discord.ext import commands
 
 import cogs
+from utils.autocomplete import AutocompleteDispatcher
 from utils.newsfeed import EventHandler
 from utils.rabbit.client import Rabbit
+from utils.ratelimit import TokenBucket
+from utils.roles import RoleIndex
+from utils.urls import URLValidator
 from utils.xp import XPManager
 
 if typing.TYPE_CHECKING:
@@ -19,6 +23,8 @@ if typing.TYPE_CHECKING:
     import arsenic
 
     import database
+    from utils.options import SelectOptionSets
+    from utils.search import CommandCatalog, VocabularyIndexes
     from views import PlaytestVoting
 
 log = logging.getLogger(__name__)
@@ -32,6 +38,9 @@ class Genji(commands.Bot):
     firefox: arsenic.Session
     xp_enabled: bool
     xp_manager: XPManager
+    vocabularies: VocabularyIndexes
+    command_catalog: CommandCatalog
+    option_sets: SelectOptionSets
 
     def __init__(self, *, session: aiohttp.ClientSession) -> None:
         super().__init__(
@@ -44,6 +53,11 @@ class Genji(commands.Bot):
         self.persistent_views_added = False
         self.analytics_buffer: list[tuple[str, int, datetime.datetime, dict]] = []
         self.genji_dispatch = EventHandler()
+        self.autocomplete = AutocompleteDispatcher()
+        self.url_validator = URLValidator(session)
+        # Discord allows roughly ten member edits per ten seconds in a guild.
+        self.role_edits = TokenBucket(rate=1.0, capacity=10)
+        self.role_index = RoleIndex()
         self.xp_enabled = True
 
     def log_analytics(self, event: str, user_id: int, timestamp: datetime.datetime, data: dict) -> None:
@@ -73,7 +87,10 @@ class Genji(commands.Bot):
             log.info(f"Loading {ext}...")
             await self.load_extension(ext)
 
+        await self.option_sets.preload()
         self.rabbitmq_task = asyncio.create_task(self._prepare_rabbitmq())
+        self.rank_summary_task = asyncio.create_task(self.database.rank_summary.setup())
+        self.rank_summary_task.add_done_callback(_log_rank_summary_failure)
 
     @staticmethod
     def _generate_intents() -> discord.Intents:
@@ -98,3 +115,8 @@ class Genji(commands.Bot):
             guild_reactions=True,
         )
         return intents
+
+
+def _log_rank_summary_failure(task: asyncio.Task[None]) -> None:
+    if not task.cancelled() and (exc := task.exception()) is not None:
+        log.warning("Couldn't set up the rank summary, ranks will be computed directly: %r", exc)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import collections
+import functools
+import logging
+import re
+import sys
+import time
+import typing
+
+log = logging.getLogger(__name__)
+
+MISSING = object()
+
+_WRITE_TARGET = re.compile(
+    r"""\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|TRUNCATE(?:\s+TABLE)?|COPY)\s+(?:ONLY\s+)?((?:"?\w+"?\.)?"?\w+"?)""",
+    re.IGNORECASE,
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def written_tables(query: str) -> frozenset[str]:
+    """Get the tables a write query modifies, used as cache tags to invalidate."""
+    tables = set()
+    for match in _WRITE_TARGET.finditer(query):
+        table = match.group(1).replace('"', "").rsplit(".", 1)[-1].lower()
+        # `ON CONFLICT ... DO UPDATE SET` isn't a table.
+        if table != "set":
+            tables.add(table)
+    return frozenset(tables)
+
+
+def _estimate_size(value: object) -> int:
+    """Roughly estimate the memory held by a cached result."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            size += _estimate_size(item)
+    elif hasattr(value, "values") and callable(value.values):
+        # asyncpg records
+        for item in value.values():
+            size += sys.getsizeof(item)
+    return size
+
+
+class _Entry(typing.NamedTuple):
+    value: object
+    expires_at: float
+    tags: frozenset[str]
+    size: int
+
+
+class QueryCache:
+    """A TTL and LRU result cache with a memory cap, invalidated by table tags.
+
+    Keys are `(query name, method, args)`. Every entry is tagged with the tables it reads from,
+    and `invalidate` drops every entry tagged with any of the given tables.
+    """
+
+    def __init__(self, *, max_bytes: int = 32 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped on every invalidation, so results read before a write can't be stored after it.
+        self.generation = 0
+        self._entries: collections.OrderedDict[typing.Hashable, _Entry] = collections.OrderedDict()
+        self._tags: dict[str, set[typing.Hashable]] = collections.defaultdict(set)
+
+    def __len__(self) -> int:
+        """Return the amount of cached entries."""
+        return len(self._entries)
+
+    def get(self, key: typing.Hashable) -> object:
+        """Get a cached value, or `MISSING` if there is no fresh entry."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(
+        self,
+        key: typing.Hashable,
+        value: object,
+        *,
+        ttl: float,
+        tags: frozenset[str],
+        generation: int,
+    ) -> None:
+        """Cache a value, unless an invalidation happened since `generation` was read."""
+        if generation != self.generation:
+            return
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(value, time.monotonic() + ttl, tags, size)
+        self.size += size
+        for tag in tags:
+            self._tags[tag].add(key)
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry tagged with any of `tags` and return how many were dropped."""
+        self.generation += 1
+        dropped = 0
+        for tag in tags:
+            for key in self._tags.pop(tag, ()):
+                if key in self._entries:
+                    self._remove(key)
+                    dropped += 1
+        if dropped:
+            log.debug("Invalidated %d cached results for %s", dropped, ", ".join(tags))
+        return dropped
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self.generation += 1
+        self._entries.clear()
+        self._tags.clear()
+        self.size = 0
+
+    def _remove(self, key: typing.Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
@@ -1,25 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import dataclasses
 import logging
+import os
 import textwrap
+import time
 import typing
-from io import BytesIO
 
 import asyncpg
 
+from database.cache import MISSING, QueryCache, written_tables
+from database.flags import UserFlagsCache
+from database.map_codes import MapCodeIndex
+from database.metrics import QueryMetrics, query_name, row_count
+from database.nicknames import NicknameLoader
+from database.queries import REGISTRY
+from database.rank_summary import RankSummary
+from database.replicas import REPLICA_FAILURES, ReplicaRouter
+from database.user_search import UserSearchIndex
 from utils import errors
 
 log = logging.getLogger(__name__)
 
+_T = typing.TypeVar("_T")
+# Called with the changed tables, or None when everything should be dropped, and the users whose
+# rows changed, or None when that isn't known.
+InvalidationHook = typing.Callable[[frozenset[str] | None, frozenset[int] | None], None]
+
+
+@dataclasses.dataclass(frozen=True)
+class PoolConfig:
+    """Connection pool settings.
+
+    `acquire_timeout` is enforced by `Database`; everything else is passed to `asyncpg.create_pool`.
+    """
+
+    min_size: int = 10
+    max_size: int = 10
+    statement_cache_size: int = 100
+    max_inactive_connection_lifetime: float = 300.0
+    command_timeout: float | None = None
+    acquire_timeout: float | None = None
+
+    @classmethod
+    def from_env(cls, prefix: str = "PSQL_POOL_") -> PoolConfig:
+        """Build a config from environment variables, e.g. PSQL_POOL_MAX_SIZE=20."""
+        values = {}
+        for field in dataclasses.fields(cls):
+            raw = os.getenv(prefix + field.name.upper())
+            if raw is None or raw == "":
+                continue
+            values[field.name] = int(raw) if field.type == "int" else float(raw)
+        return cls(**values)
+
+    def pool_kwargs(self) -> dict[str, typing.Any]:
+        return {
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "statement_cache_size": self.statement_cache_size,
+            "max_inactive_connection_lifetime": self.max_inactive_connection_lifetime,
+            "command_timeout": self.command_timeout,
+        }
+
+
+class PoolStats(typing.NamedTuple):
+    size: int
+    min_size: int
+    max_size: int
+    idle: int
+    in_use: int
+    waiters: int
+    acquire_timeouts: int
+    acquire_p50: float
+    acquire_p95: float
+    acquire_max: float
+
 
 class DatabaseConnection:
     """Handles asynchronous context manager for database connection."""
 
-    def __init__(self, dsn: str) -> None:
+    def __init__(self, dsn: str, config: PoolConfig | None = None) -> None:
         self.connection: asyncpg.Pool | None = None
         self.dsn = dsn
+        self.config = config or PoolConfig()
 
     async def __aenter__(self) -> asyncpg.Pool | None:
         """Create asyncpg connection."""
-        self.connection = await asyncpg.create_pool(self.dsn)
+        self.connection = await asyncpg.create_pool(self.dsn, **self.config.pool_kwargs())
         return self.connection
 
     async def __aexit__(self, *args) -> None:
@@ -28,69 +97,134 @@ class DatabaseConnection:
             await self.connection.close()
 
 
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
 class DotRecord(asyncpg.Record):
-    """Adds dot access to asyncpg.Record."""
+    """Adds dot access to asyncpg.Record.
 
-    def __getattr__(self, attr: str) -> str | float | None:
-        """Get dot access."""
-        return super().__getitem__(attr)
+    Attribute access is the C-level item lookup itself. Column positions are resolved once
+    per query shape by asyncpg, so no Python frame runs per access. Records hash by identity,
+    so rows with list columns stay hashable.
+    """
 
-    def __hash__(self) -> int:
-        """Return hashed version of values."""
-        return hash(self.values())
+    __getattr__ = asyncpg.Record.__getitem__
+    __hash__ = object.__hash__
 
 
 class Database:
     """Handles all database transactions."""
 
-    def __init__(self, conn: asyncpg.Pool) -> None:
+    def __init__(
+        self,
+        conn: asyncpg.Pool,
+        *,
+        slow_query_threshold: float = 0.25,
+        stream_prefetch: int = 500,
+        acquire_timeout: float | None = None,
+        replicas: typing.Sequence[asyncpg.Pool] = (),
+        max_replica_lag: float = 5.0,
+        cache_max_bytes: int = 32 * 1024 * 1024,
+    ) -> None:
         self.pool = conn
+        self.stream_prefetch = stream_prefetch
+        self.acquire_timeout = acquire_timeout
+        self.replicas = ReplicaRouter(replicas, max_lag=max_replica_lag)
+        self._waiters = 0
+        self.metrics = QueryMetrics(slow_query_threshold=slow_query_threshold)
+        self.cache = QueryCache(max_bytes=cache_max_bytes)
+        self._invalidation_hooks: list[InvalidationHook] = []
+        self.nicknames = NicknameLoader(self)
+        self.user_flags = UserFlagsCache(self)
+        self.map_codes = MapCodeIndex(self)
+        self.user_search = UserSearchIndex(self)
+        self.rank_summary = RankSummary(self)
+        # Tables written inside each open `transaction`, invalidated once it commits.
+        self._transactions: dict[asyncpg.Connection, dict[str, set[int] | None]] = {}
+        # Server pids of the primary pool's connections, so the change listener can skip the bot's own writes.
+        self.backend_pids: set[int] = set()
+
+    async def copy_from_query(
+        self,
+        query: str,
+        *args,
+        output: typing.Callable[[bytes], typing.Awaitable[typing.Any]],
+        readonly: bool = False,
+    ) -> int:
+        """Stream the result of a query as CSV with a header into `output` and return the row count.
+
+        `output` is awaited for every chunk, so a slow consumer applies backpressure instead of
+        buffering the whole result in memory.
+        """
 
-    async def copy_from_query(self, query: str) -> BytesIO:
-        async with self.pool.acquire() as conn:
-            buf = BytesIO()
-            await conn.copy_from_query(
+        async def _copy(conn: asyncpg.Connection, _: asyncpg.Pool) -> int:
+            start = time.perf_counter()
+            status = await conn.copy_from_query(
                 query,
-                output=buf,
+                *args,
+                output=output,
                 format="csv",
                 header=True,
             )
-            buf.seek(0)
-            return buf
+            rows = row_count(status, status=True)
+            self.metrics.observe(query_name(query), time.perf_counter() - start, rows, args)
+            return rows
 
-    async def get(
+        return await self._route(_copy, None, readonly)
+
+    async def stream(
         self,
         query: str,
         *args,
-    ) -> typing.Generator[None, None, DotRecord]:
-        """Get rows.
-
-        The get_query_handler function is a helper function
-        that takes in a model and query string.
-        It then returns the results of the query as an array of records.
-
+        prefetch: int | None = None,
+        readonly: bool = False,
+    ) -> typing.AsyncIterator[DotRecord]:
+        """Stream rows through a server-side cursor.
+
+        Only use this for large scans that shouldn't be materialized in memory at once;
+        bounded reads should use `fetch` or `fetchrow`. The cursor holds a connection and
+        a read-only transaction open until iteration finishes, so avoid slow awaits
+        between rows. With `readonly`, a replica that fails before the first row falls back
+        to the primary.
         """
         if self.pool is None:
             raise errors.DatabaseConnectionError()
-        query = textwrap.dedent(query)
-        log.debug(query)
-        log.debug(args)
 
-        async with self.pool.acquire() as conn, conn.transaction():
-            async for record in conn.cursor(
-                query,
-                *args,
-                record_class=DotRecord,
-            ):
-                yield record
-
-    async def get_row(self, query: str, *args) -> DotRecord | None:
-        res = [x async for x in self.get(query, *args)]
-        if res:
-            res = res[0]
-        return res
-
-    async def set(self, query: str, *args) -> None:
+        replica = self.replicas.pick() if readonly else None
+        rows = 0
+        failed = False
+        start = time.perf_counter()
+        try:
+            while True:
+                pool = replica.pool if replica else self.pool
+                try:
+                    async with self._acquire(pool) as conn, conn.transaction(readonly=True):
+                        async for record in conn.cursor(
+                            query,
+                            *args,
+                            prefetch=prefetch or self.stream_prefetch,
+                            record_class=DotRecord,
+                        ):
+                            rows += 1
+                            yield record
+                except asyncio.TimeoutError:
+                    raise
+                except REPLICA_FAILURES as e:
+                    if replica is None or rows:
+                        raise
+                    self.replicas.mark_down(replica, e)
+                    replica = None
+                    continue
+                break
+        except Exception:
+            failed = True
+            raise
+        finally:
+            # Also recorded when the consumer stops iterating early.
+            self.metrics.observe(query_name(query), time.perf_counter() - start, rows, args, failed=failed)
+
+    async def set(self, query: str, *args, user_ids: typing.Collection[int] | None = None) -> None:
         """Set values.
 
         The set_query_handler function takes a query string
@@ -102,8 +236,8 @@ class Database:
         if self.pool is None:
             raise errors.DatabaseConnectionError()
 
-        async with self.pool.acquire() as conn, conn.transaction():
-            await conn.execute(query, *args)
+        async with self.transaction() as conn:
+            await self._call(conn, "execute", query, args, user_ids=user_ids)
 
     async def set_many(
         self,
@@ -121,44 +255,64 @@ class Database:
         if self.pool is None:
             raise errors.DatabaseConnectionError()
 
-        async with self.pool.acquire() as conn, conn.transaction():
-            await conn.executemany(query, *args)
+        async with self.transaction() as conn:
+            await self._call(conn, "executemany", query, args)
 
     async def fetch(
         self,
         query: str,
         *args,
         connection: asyncpg.Connection | asyncpg.Pool | None = None,
-    ) -> list[asyncpg.Record]:
-        _connection = connection or self.pool
-        return await _connection.fetch(query, *args)
+        readonly: bool = False,
+    ) -> list[DotRecord]:
+        result = await self._route(
+            lambda conn, _: self._call(conn, "fetch", query, args, record_class=DotRecord),
+            connection,
+            readonly,
+        )
+        return typing.cast("list[DotRecord]", result)
 
     async def fetchval(
         self,
         query: str,
         *args,
         connection: asyncpg.Connection | asyncpg.Pool | None = None,
+        readonly: bool = False,
     ) -> typing.Any:
-        _connection = connection or self.pool
-        return await _connection.fetchval(query, *args)
+        return await self._route(
+            lambda conn, _: self._call(conn, "fetchval", query, args),
+            connection,
+            readonly,
+        )
 
     async def fetchrow(
         self,
         query: str,
         *args,
         connection: asyncpg.Connection | asyncpg.Pool | None = None,
-    ) -> asyncpg.Record:
-        _connection = connection or self.pool
-        return await _connection.fetchrow(query, *args) # type: ignore
+        readonly: bool = False,
+    ) -> DotRecord | None:
+        result = await self._route(
+            lambda conn, _: self._call(conn, "fetchrow", query, args, record_class=DotRecord),
+            connection,
+            readonly,
+        )
+        return typing.cast("DotRecord | None", result)
 
     async def execute(
         self,
         query: str,
         *args,
         connection: asyncpg.Connection | asyncpg.Pool | None = None,
+        user_ids: typing.Collection[int] | None = None,
     ) -> None:
-        _connection = connection or self.pool
-        await _connection.execute(query, *args)
+        """Execute a write.
+
+        Pass `user_ids` when the write only touches those users' rows, so per-user caches
+        forget just them instead of everyone.
+        """
+        async with self._acquire(connection) as conn:
+            await self._call(conn, "execute", query, args, user_ids=user_ids)
 
     async def executemany(
         self,
@@ -166,17 +320,345 @@ class Database:
         args: typing.Iterable[typing.Any],
         connection: asyncpg.Connection | asyncpg.Pool | None = None,
     ) -> None:
-        _connection = connection or self.pool
-        await _connection.executemany(query, args)
+        async with self._acquire(connection) as conn:
+            await self._call(conn, "executemany", query, (args,))
+
+    async def bulk_copy(
+        self,
+        table: str,
+        columns: typing.Sequence[str],
+        records: typing.Iterable[typing.Sequence[typing.Any]],
+        *,
+        conflict: typing.Sequence[str] | None = None,
+        update: typing.Sequence[str] | None = None,
+        connection: asyncpg.Connection | asyncpg.Pool | None = None,
+    ) -> int:
+        """Bulk insert rows with the COPY protocol and return the amount of rows written.
+
+        Without `conflict`, rows are copied straight into `table`.
+        With `conflict`, rows are copied into a temporary staging table and merged with
+        `INSERT ... ON CONFLICT (conflict)`. The `update` columns are overwritten only when
+        they changed; without `update`, conflicting rows are skipped.
+        """
+        name = f"COPY {table}"
+        start = time.perf_counter()
+        async with self._acquire(connection) as conn:
+            try:
+                if conflict is None:
+                    status = await conn.copy_records_to_table(table, records=records, columns=columns)
+                else:
+                    async with conn.transaction():
+                        status = await self._copy_merge(
+                            conn, table, columns, records, conflict=conflict, update=update or ()
+                        )
+            except Exception:
+                self.metrics.observe(name, time.perf_counter() - start, 0, (), failed=True)
+                raise
+            self._written(conn, {table})
+        rows = row_count(status, status=True)
+        self.metrics.observe(name, time.perf_counter() - start, rows, ())
+        return rows
+
+    @staticmethod
+    async def _copy_merge(
+        conn: asyncpg.Connection,
+        table: str,
+        columns: typing.Sequence[str],
+        records: typing.Iterable[typing.Sequence[typing.Any]],
+        *,
+        conflict: typing.Sequence[str],
+        update: typing.Sequence[str],
+    ) -> str:
+        staging = f"_staging_{table}"
+        cols = ", ".join(_quote_ident(c) for c in columns)
+        keys = ", ".join(_quote_ident(c) for c in conflict)
+        await conn.execute(
+            f"CREATE TEMPORARY TABLE {_quote_ident(staging)} ON COMMIT DROP AS "
+            f"SELECT {cols} FROM {_quote_ident(table)} WITH NO DATA"
+        )
+        await conn.copy_records_to_table(staging, records=records, columns=columns)
+        if update:
+            targets = ", ".join(_quote_ident(c) for c in update)
+            excluded = ", ".join(f"excluded.{_quote_ident(c)}" for c in update)
+            action = (
+                f"DO UPDATE SET ({targets}) = ROW({excluded}) "
+                f"WHERE ({', '.join(f'{_quote_ident(table)}.{_quote_ident(c)}' for c in update)}) "
+                f"IS DISTINCT FROM ({excluded})"
+            )
+        else:
+            action = "DO NOTHING"
+        # DISTINCT ON keeps a single row per key; ON CONFLICT can't touch the same row twice.
+        return await conn.execute(
+            f"INSERT INTO {_quote_ident(table)} ({cols}) "
+            f"SELECT DISTINCT ON ({keys}) {cols} FROM {_quote_ident(staging)} "
+            f"ON CONFLICT ({keys}) {action}"
+        )
+
+    @contextlib.asynccontextmanager
+    async def transaction(
+        self,
+        connection: asyncpg.Connection | asyncpg.Pool | None = None,
+    ) -> typing.AsyncIterator[asyncpg.Connection]:
+        """Run a transaction, holding back cache invalidation for its writes until it commits.
+
+        Pass the connection on with `connection=` so writes made through `Database` join the
+        transaction. Invalidating before COMMIT would let a concurrent read cache the old rows
+        for the whole TTL. Writes in transactions opened directly on a connection are
+        invalidated right away.
+        """
+        async with self._acquire(connection) as conn:
+            if conn in self._transactions:
+                # A savepoint, the outer transaction invalidates when it commits.
+                async with conn.transaction():
+                    yield conn
+                return
+            self._transactions[conn] = written = {}
+            try:
+                async with conn.transaction():
+                    yield conn
+            finally:
+                del self._transactions[conn]
+            if everyone := [table for table, user_ids in written.items() if user_ids is None]:
+                self.invalidate(*everyone)
+            for table, user_ids in written.items():
+                if user_ids is not None:
+                    self.invalidate(table, user_ids=user_ids)
+
+    def _track_backend(self, conn: asyncpg.Connection) -> None:
+        pid = conn.get_server_pid()
+        if pid not in self.backend_pids:
+            self.backend_pids.add(pid)
+            conn.add_termination_listener(lambda _: self.backend_pids.discard(pid))
+
+    def _written(
+        self,
+        conn: asyncpg.Connection,
+        tables: typing.Iterable[str],
+        user_ids: typing.Collection[int] | None = None,
+    ) -> None:
+        """Invalidate tables written on a connection, or once its `transaction` commits."""
+        pending = self._transactions.get(conn)
+        if pending is None:
+            self.invalidate(*tables, user_ids=user_ids)
+            return
+        for table in tables:
+            if user_ids is None or (table in pending and pending[table] is None):
+                pending[table] = None
+            else:
+                pending.setdefault(table, set()).update(user_ids)
+
+    @contextlib.asynccontextmanager
+    async def _acquire(
+        self,
+        connection: asyncpg.Connection | asyncpg.Pool | None = None,
+    ) -> typing.AsyncIterator[asyncpg.Connection]:
+        if connection is not None and not isinstance(connection, asyncpg.Pool):
+            yield connection
+            return
+
+        pool = connection or self.pool
+        start = time.perf_counter()
+        self._waiters += 1
+        try:
+            conn = await pool.acquire(timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.metrics.observe_acquire(time.perf_counter() - start, timed_out=True)
+            log.warning("Timed out acquiring a database connection: %s", self.pool_stats())
+            raise errors.DatabaseBusyError from None
+        finally:
+            self._waiters -= 1
+        self.metrics.observe_acquire(time.perf_counter() - start)
+        if pool is self.pool:
+            self._track_backend(conn)
+        try:
+            yield conn
+        finally:
+            await pool.release(conn)
+
+    async def _route(
+        self,
+        operation: typing.Callable[[asyncpg.Connection, asyncpg.Pool], typing.Awaitable[_T]],
+        connection: asyncpg.Connection | asyncpg.Pool | None,
+        readonly: bool,
+    ) -> _T:
+        """Run an operation on a read replica if allowed and available, otherwise on the primary.
+
+        Reads only go to a replica when marked `readonly` and not bound to a specific connection.
+        If the replica turns out to be down, it is taken out of rotation and the read is retried
+        on the primary.
+        """
+        replica = self.replicas.pick() if readonly and connection is None else None
+        if replica is not None:
+            try:
+                async with self._acquire(replica.pool) as conn:
+                    return await operation(conn, replica.pool)
+            except asyncio.TimeoutError:
+                # A slow query, the replica itself is fine.
+                raise
+            except REPLICA_FAILURES as e:
+                self.replicas.mark_down(replica, e)
+        async with self._acquire(connection) as conn:
+            return await operation(conn, connection if isinstance(connection, asyncpg.Pool) else self.pool)
+
+    def add_invalidation_hook(self, hook: InvalidationHook) -> None:
+        """Register an in-memory cache outside of `Database` to be told about table changes."""
+        self._invalidation_hooks.append(hook)
+
+    def invalidate(self, *tables: str, user_ids: typing.Collection[int] | None = None) -> int:
+        """Drop cached query results that read from any of `tables`.
+
+        Hooks are told about `user_ids` when the change only touched those users' rows.
+        """
+        dropped = self.cache.invalidate(*tables)
+        changed = frozenset(tables)
+        users = None if user_ids is None else frozenset(user_ids)
+        for hook in self._invalidation_hooks:
+            hook(changed, users)
+        return dropped
+
+    def flush(self) -> None:
+        """Drop every cached result, e.g. when table changes may have been missed."""
+        self.cache.clear()
+        for hook in self._invalidation_hooks:
+            hook(None, None)
+
+    def pool_stats(self) -> PoolStats:
+        """Get a snapshot of pool usage and acquire latency."""
+        acquire = self.metrics.acquire
+        size = self.pool.get_size()
+        idle = self.pool.get_idle_size()
+        return PoolStats(
+            size=size,
+            min_size=self.pool.get_min_size(),
+            max_size=self.pool.get_max_size(),
+            idle=idle,
+            in_use=size - idle,
+            waiters=self._waiters,
+            acquire_timeouts=self.metrics.acquire_timeouts,
+            acquire_p50=acquire.percentile(50),
+            acquire_p95=acquire.percentile(95),
+            acquire_max=acquire.max,
+        )
+
+    async def _call(
+        self,
+        conn: asyncpg.Connection,
+        method: typing.Literal["fetch", "fetchrow", "fetchval", "execute", "executemany"],
+        query: str,
+        args: tuple[typing.Any, ...],
+        *,
+        user_ids: typing.Collection[int] | None = None,
+        **kwargs: object,
+    ) -> object:
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(textwrap.dedent(query))
+            log.debug(args)
+        name = query_name(query)
+        start = time.perf_counter()
+        try:
+            result = await getattr(conn, method)(query, *args, **kwargs)
+        except Exception:
+            self.metrics.observe(name, time.perf_counter() - start, 0, args, failed=True)
+            raise
+        rows = row_count(result, status=method in {"execute", "executemany"})
+        self.metrics.observe(name, time.perf_counter() - start, rows, args)
+        if tables := written_tables(query):
+            self._written(conn, tables, user_ids)
+        return result
+
+    async def _execute_named(
+        self,
+        method: typing.Literal["fetch", "fetchrow", "fetchval"],
+        name: str,
+        args: tuple[typing.Any, ...],
+        connection: asyncpg.Connection | asyncpg.Pool | None,
+        readonly: bool,
+        *,
+        user_ids: typing.Collection[int] | None = None,
+    ) -> object:
+        query = REGISTRY[name]
+        cacheable = query.cache_ttl is not None and connection is None
+        if cacheable:
+            key = (name, method, args)
+            generation = self.cache.generation
+            try:
+                cached = self.cache.get(key)
+            except TypeError:
+                # Unhashable arguments, e.g. lists.
+                cacheable = False
+            else:
+                if cached is not MISSING:
+                    return list(typing.cast("tuple[DotRecord, ...]", cached)) if method == "fetch" else cached
+
+        async def _execute(conn: asyncpg.Connection, _: asyncpg.Pool) -> object:
+            # asyncpg prepares the statement once per connection and keeps it in its statement cache.
+            kwargs = {} if method == "fetchval" else {"record_class": DotRecord}
+            start = time.perf_counter()
+            try:
+                result = await getattr(conn, method)(query.sql, *args, **kwargs)
+            except Exception:
+                self.metrics.observe(name, time.perf_counter() - start, 0, args, failed=True)
+                raise
+            self.metrics.observe(name, time.perf_counter() - start, row_count(result), args)
+            if not cacheable and (tables := written_tables(query.sql)):
+                self._written(conn, tables, user_ids)
+            return result
+
+        result = await self._route(_execute, connection, readonly)
+        if cacheable:
+            value = tuple(result) if method == "fetch" else result
+            self.cache.set(key, value, ttl=query.cache_ttl, tags=query.tags, generation=generation)
+        return result
+
+    async def fetch_named(
+        self,
+        name: str,
+        *args,
+        connection: asyncpg.Connection | asyncpg.Pool | None = None,
+        readonly: bool = False,
+    ) -> list[DotRecord]:
+        """Fetch rows using a query from the named query registry."""
+        return typing.cast("list[DotRecord]", await self._execute_named("fetch", name, args, connection, readonly))
+
+    async def fetchrow_named(
+        self,
+        name: str,
+        *args,
+        connection: asyncpg.Connection | asyncpg.Pool | None = None,
+        readonly: bool = False,
+    ) -> DotRecord | None:
+        """Fetch a single row using a query from the named query registry."""
+        row = await self._execute_named("fetchrow", name, args, connection, readonly)
+        return typing.cast("DotRecord | None", row)
+
+    async def fetchval_named(
+        self,
+        name: str,
+        *args,
+        connection: asyncpg.Connection | asyncpg.Pool | None = None,
+        readonly: bool = False,
+    ) -> object:
+        """Fetch a single value using a query from the named query registry."""
+        return await self._execute_named("fetchval", name, args, connection, readonly)
+
+    async def execute_named(
+        self,
+        name: str,
+        *args,
+        connection: asyncpg.Connection | asyncpg.Pool | None = None,
+        user_ids: typing.Collection[int] | None = None,
+    ) -> None:
+        """Execute a write using a query from the named query registry."""
+        await self._execute_named("fetchval", name, args, connection, False, user_ids=user_ids)
 
     async def fetch_user_flags(self, user_id: int) -> int:
-        query = "SELECT flags FROM users WHERE user_id = $1"
-        return await self.fetchval(query, user_id)
+        return await self.user_flags.get(user_id)
+
+    async def set_user_flags(self, user_id: int, flags: int) -> None:
+        await self.user_flags.set(user_id, flags)
 
     async def fetch_nickname(self, user_id: int) -> str:
-        query = "SELECT nickname FROM users WHERE user_id = $1"
-        return await self.fetchval(query, user_id)
+        return await self.nicknames.load(user_id)
 
     async def is_existing_map_code(self, map_code: str) -> bool:
-        query = "SELECT EXISTS(SELECT map_code FROM maps WHERE map_code = $1)"
-        return await self.fetchval(query, map_code)
+        return await self.map_codes.exists(map_code)
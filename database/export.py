@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import gzip
+import logging
+import pathlib
+import tempfile
+import typing
+
+import msgspec
+
+if typing.TYPE_CHECKING:
+    from database.database import Database
+
+log = logging.getLogger(__name__)
+
+ExportFormat = typing.Literal["csv", "jsonl"]
+
+# Uncompressed bytes handed to the compressor at once.
+_CHUNK_SIZE = 256 * 1024
+# Room left under the part size limit for the compressor's buffered output and gzip trailer.
+_PART_HEADROOM = 1024 * 1024
+
+
+class _RecordSplitter:
+    """Cut a raw CSV byte stream into whole records.
+
+    COPY output arrives in arbitrary chunks and quoted fields may contain newlines, so a newline
+    only ends a record when it is outside of quotes. Escaped quotes (``""``) toggle twice and
+    cancel out.
+    """
+
+    def __init__(self) -> None:
+        self.header: bytes | None = None
+        self._pending = bytearray()
+        self._in_quotes = False
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Add a chunk and return every complete record buffered so far."""
+        position = len(self._pending)
+        self._pending += chunk
+        cut = -1
+        for i, segment in enumerate(chunk.split(b'"')):
+            if i:
+                self._in_quotes = not self._in_quotes
+            if not self._in_quotes and (newline := segment.rfind(b"\n")) != -1:
+                cut = position + newline
+            position += len(segment) + 1
+        if cut == -1:
+            return b""
+
+        complete = bytes(self._pending[: cut + 1])
+        del self._pending[: cut + 1]
+        if self.header is None:
+            end = complete.index(b"\n") + 1
+            self.header, complete = complete[:end], complete[end:]
+        return complete
+
+    def finish(self) -> bytes:
+        rest = bytes(self._pending)
+        self._pending.clear()
+        return rest + b"\n" if rest else b""
+
+
+class _PartWriter:
+    """Write gzip compressed parts that each stay under a size limit.
+
+    Parts are only split between records, and every part starts with the header.
+    """
+
+    def __init__(self, directory: pathlib.Path, filename: str, extension: str, max_part_size: int) -> None:
+        self.directory = directory
+        self.filename = filename
+        self.extension = extension
+        self.threshold = max(max_part_size - _PART_HEADROOM, _CHUNK_SIZE)
+        self.header = b""
+        self.parts: list[pathlib.Path] = []
+        self._raw: typing.BinaryIO | None = None
+        self._gzip: gzip.GzipFile | None = None
+
+    def write(self, data: bytes) -> None:
+        if not data:
+            return
+        if self._gzip is None:
+            self._open_part()
+        self._gzip.write(data)
+        if self._raw.tell() >= self.threshold:
+            self._close_part()
+
+    def close(self) -> None:
+        if not self.parts:
+            # Still produce a (header only) file for empty results.
+            self._open_part()
+        self._close_part()
+        if len(self.parts) == 1:
+            single = self.parts[0].with_name(f"{self.filename}.{self.extension}.gz")
+            self.parts[0] = self.parts[0].rename(single)
+
+    def _open_part(self) -> None:
+        path = self.directory / f"{self.filename}-{len(self.parts) + 1}.{self.extension}.gz"
+        self._raw = path.open("wb")
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        self.parts.append(path)
+        self._gzip.write(self.header)
+
+    def _close_part(self) -> None:
+        if self._gzip is not None:
+            self._gzip.close()
+            self._raw.close()
+            self._gzip = self._raw = None
+
+
+@contextlib.asynccontextmanager
+async def export_query(
+    db: Database,
+    query: str,
+    *args,
+    fmt: ExportFormat = "csv",
+    filename: str = "export",
+    max_part_size: int,
+    readonly: bool = True,
+) -> typing.AsyncIterator[list[pathlib.Path]]:
+    """Export query results to gzip compressed files in a temporary directory.
+
+    Rows are streamed and spooled to disk, so memory use stays bounded regardless of the
+    result size. Output larger than `max_part_size` is split into numbered parts.
+    The files are deleted when the context manager exits.
+    """
+    with tempfile.TemporaryDirectory(prefix="genji-export-") as directory:
+        writer = _PartWriter(pathlib.Path(directory), filename, fmt, max_part_size)
+        try:
+            if fmt == "csv":
+                await _export_csv(db, query, args, writer, readonly)
+            else:
+                await _export_jsonl(db, query, args, writer, readonly)
+        finally:
+            await asyncio.to_thread(writer.close)
+        log.debug("Exported %s to %d part(s).", filename, len(writer.parts))
+        yield writer.parts
+
+
+async def _export_csv(
+    db: Database,
+    query: str,
+    args: tuple[typing.Any, ...],
+    writer: _PartWriter,
+    readonly: bool,
+) -> None:
+    splitter = _RecordSplitter()
+    buffer = bytearray()
+
+    async def _output(chunk: bytes) -> None:
+        buffer.extend(splitter.feed(chunk))
+        if writer.header == b"" and splitter.header is not None:
+            writer.header = splitter.header
+        if len(buffer) >= _CHUNK_SIZE:
+            await asyncio.to_thread(writer.write, bytes(buffer))
+            buffer.clear()
+
+    await db.copy_from_query(query, *args, output=_output, readonly=readonly)
+    buffer.extend(splitter.finish())
+    await asyncio.to_thread(writer.write, bytes(buffer))
+
+
+async def _export_jsonl(
+    db: Database,
+    query: str,
+    args: tuple[typing.Any, ...],
+    writer: _PartWriter,
+    readonly: bool,
+) -> None:
+    encoder = msgspec.json.Encoder(enc_hook=str)
+    buffer = bytearray()
+    async for record in db.stream(query, *args, readonly=readonly):
+        encoder.encode_into(dict(record.items()), buffer, -1)
+        buffer.extend(b"\n")
+        if len(buffer) >= _CHUNK_SIZE:
+            await asyncio.to_thread(writer.write, bytes(buffer))
+            buffer.clear()
+    await asyncio.to_thread(writer.write, bytes(buffer))
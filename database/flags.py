@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import typing
+
+if typing.TYPE_CHECKING:
+    from database.database import Database
+
+
+class UserFlagsCache:
+    """Keep every looked up user's settings flags in memory.
+
+    Flags are written through: `set` updates the database first and then the cache, so
+    a read that follows a write always sees it. Bot writes that name the users they touch
+    only drop those users; other changes to the `users` table drop every cached user.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self.database = database
+        self._flags: dict[int, int | None] = {}
+        # Bumped on writes and invalidation, so a read that raced one doesn't cache the old flags.
+        self._generation = 0
+        database.add_invalidation_hook(self._on_tables_changed)
+
+    def __len__(self) -> int:
+        """Return the amount of cached users."""
+        return len(self._flags)
+
+    async def get(self, user_id: int) -> int | None:
+        """Get a user's flags, or None if the user doesn't exist."""
+        try:
+            return self._flags[user_id]
+        except KeyError:
+            pass
+        generation = self._generation
+        flags = typing.cast("int | None", await self.database.fetchval_named("user_flags", user_id))
+        if generation == self._generation:
+            self._flags[user_id] = flags
+        return flags
+
+    async def set(self, user_id: int, flags: int) -> None:
+        """Update a user's flags in the database and the cache."""
+        await self.database.execute_named("user_flags_update", int(flags), user_id, user_ids=(user_id,))
+        self._generation += 1
+        self._flags[user_id] = int(flags)
+
+    def invalidate(self, user_id: int | None = None) -> None:
+        """Forget cached flags for a user, or for every user if `user_id` is None."""
+        self._generation += 1
+        if user_id is None:
+            self._flags.clear()
+        else:
+            self._flags.pop(user_id, None)
+
+    def _on_tables_changed(self, tables: frozenset[str] | None, user_ids: frozenset[int] | None) -> None:
+        if tables is not None and "users" not in tables:
+            return
+        if user_ids is None:
+            self.invalidate()
+            return
+        for user_id in user_ids:
+            self.invalidate(user_id)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import typing
+
+import asyncpg
+
+if typing.TYPE_CHECKING:
+    from database.database import Database
+
+log = logging.getLogger(__name__)
+
+CHANNEL = "genji_table_changes"
+
+
+class CacheInvalidationListener:
+    """Evict cached data when tables change, including writes made outside the bot.
+
+    Listens for table change notifications on a dedicated connection and forwards them to
+    `Database.invalidate`. The triggers that send them are installed by
+    `database/migrations/001_table_change_notify.sql`; the listener only LISTENs. Writes the bot
+    makes through `Database` already invalidated locally, so notifications sent by the bot's own
+    backends are skipped. Notifications sent while the connection is down are lost, so every
+    (re)connect flushes all caches before listening again.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        database: Database,
+        *,
+        ping_interval: float = 60.0,
+        max_reconnect_delay: float = 60.0,
+    ) -> None:
+        self.dsn = dsn
+        self.database = database
+        self.ping_interval = ping_interval
+        self.max_reconnect_delay = max_reconnect_delay
+        self._connection: asyncpg.Connection | None = None
+        self._lost = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    async def __aenter__(self) -> typing.Self:
+        """Start listening in the background."""
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        """Stop listening and close the connection."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
+
+    async def _run(self) -> None:
+        delay = 1.0
+        while True:
+            try:
+                await self._connect()
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                log.warning("Cache invalidation listener could not connect, retrying in %.0fs: %r", delay, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+            delay = 1.0
+            await self._wait_until_lost()
+            log.warning("Cache invalidation listener lost its connection, reconnecting.")
+
+    async def _connect(self) -> None:
+        self._lost.clear()
+        connection = await asyncpg.connect(self.dsn)
+        try:
+            await self._check_triggers(connection)
+            connection.add_termination_listener(self._on_termination)
+            await connection.add_listener(CHANNEL, self._on_notification)
+        except BaseException:
+            await connection.close()
+            raise
+        self._connection = connection
+        # Anything could have changed while nobody was listening.
+        self.database.flush()
+        log.info("Cache invalidation listener connected.")
+
+    @staticmethod
+    async def _check_triggers(connection: asyncpg.Connection) -> None:
+        if await connection.fetchval("SELECT to_regproc('genji_notify_table_change') IS NULL"):
+            log.warning(
+                "Table change triggers are missing, so only the bot's own writes invalidate caches. "
+                "Apply database/migrations/001_table_change_notify.sql."
+            )
+
+    async def _wait_until_lost(self) -> None:
+        # The termination listener doesn't fire for connections that die silently, so ping too.
+        while not self._lost.is_set():
+            try:
+                await asyncio.wait_for(self._lost.wait(), self.ping_interval)
+            except asyncio.TimeoutError:
+                try:
+                    await self._connection.fetchval("SELECT 1", timeout=self.ping_interval / 2)
+                except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                    self._lost.set()
+        if not self._connection.is_closed():
+            self._connection.terminate()
+
+    def _on_termination(self, _: asyncpg.Connection) -> None:
+        self._lost.set()
+
+    def _on_notification(self, _: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        if pid in self.database.backend_pids:
+            # The bot's own write, which `Database` invalidated when it committed.
+            return
+        if payload == "*":
+            log.debug("Flushing all caches, requested through %s.", channel)
+            self.database.flush()
+            return
+        # Payloads are a table name, optionally followed by `:<key>`.
+        table = payload.partition(":")[0].strip().lower()
+        if table:
+            self.database.invalidate(table)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import typing
+
+from utils.search import TrigramIndex
+
+if typing.TYPE_CHECKING:
+    from database.database import Database
+
+log = logging.getLogger(__name__)
+
+
+def normalize_map_code(map_code: str) -> str:
+    """Normalise typed input the same way the map code transformers clean it."""
+    return map_code.upper().replace("O", "0").strip()
+
+
+class MapCodeEntry(typing.NamedTuple):
+    map_code: str
+    archived: bool
+    official: bool
+
+
+class _TrieNode:
+    __slots__ = ("children", "map_code")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.map_code: str | None = None
+
+
+class MapCodeIndex:
+    """Every map code in memory, for autocomplete and existence checks.
+
+    Codes live in a prefix trie exactly as stored, with the archived and official flags
+    alongside, so lookups match the `maps` table like `WHERE map_code = $1` would. Autocomplete
+    serves prefix matches first and falls back to trigram similarity, like the `similarity()`
+    sort it replaces.
+
+    Any change to the `maps` table marks the index stale, and it's rebuilt in the background
+    with one query. Autocomplete keeps answering from the stale index meanwhile, and lookups
+    ask the database directly until the rebuild is done.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self.database = database
+        self._entries: dict[str, MapCodeEntry] = {}
+        self._root = _TrieNode()
+        self._fuzzy: TrigramIndex | None = None
+        self._loaded = False
+        self._stale = True
+        # Bumped when the table changes, so a rebuild that raced a change is redone.
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        self._rebuild_task: asyncio.Task[None] | None = None
+        database.add_invalidation_hook(self._on_tables_changed)
+
+    def __len__(self) -> int:
+        """Return the amount of indexed map codes."""
+        return len(self._entries)
+
+    async def get(self, map_code: str) -> MapCodeEntry | None:
+        """Get a map code and its flags, or None if the map doesn't exist."""
+        if not self._loaded:
+            await self._ensure_fresh()
+        elif self._stale:
+            self._schedule_rebuild()
+            row = await self.database.fetchrow_named("map_code_lookup", map_code)
+            return None if row is None else MapCodeEntry(row["map_code"], bool(row["archived"]), bool(row["official"]))
+        return self._entries.get(map_code)
+
+    async def exists(self, map_code: str, *, include_archived: bool = True) -> bool:
+        """Check if a map code exists."""
+        entry = await self.get(map_code)
+        return entry is not None and (include_archived or not entry.archived)
+
+    async def search(self, query: str, limit: int = 5, *, include_archived: bool = False) -> list[str]:
+        """Get up to `limit` map codes that start with or resemble `query`."""
+        if not self._loaded:
+            await self._ensure_fresh()
+        elif self._stale:
+            self._schedule_rebuild()
+
+        prefix = normalize_map_code(query)
+        results = self._prefixed(prefix, limit, include_archived)
+        if len(results) < limit:
+            seen = set(results)
+            for key in self._fuzzy_index().search(prefix, 2 * limit + len(seen)):
+                entry = self._entries[key]
+                if entry.map_code not in seen and (include_archived or not entry.archived):
+                    results.append(entry.map_code)
+                    if len(results) == limit:
+                        break
+        return results
+
+    def _prefixed(self, prefix: str, limit: int, include_archived: bool) -> list[str]:
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        results = []
+        stack = [node]
+        while stack and len(results) < limit:
+            node = stack.pop()
+            if node.map_code is not None:
+                entry = self._entries[node.map_code]
+                if include_archived or not entry.archived:
+                    results.append(entry.map_code)
+            # Reversed, so codes come out in alphabetical order.
+            stack.extend(node.children[char] for char in sorted(node.children, reverse=True))
+        return results
+
+    def _fuzzy_index(self) -> TrigramIndex:
+        if self._fuzzy is None:
+            self._fuzzy = TrigramIndex(sorted(self._entries))
+        return self._fuzzy
+
+    async def _ensure_fresh(self) -> None:
+        while self._stale:
+            await self._rebuild()
+
+    def _schedule_rebuild(self) -> None:
+        if self._rebuild_task is None or self._rebuild_task.done():
+            self._rebuild_task = asyncio.create_task(self._rebuild())
+            self._rebuild_task.add_done_callback(_log_rebuild_failure)
+
+    async def _rebuild(self) -> None:
+        async with self._lock:
+            if not self._stale:
+                return
+            generation = self._generation
+            rows = await self.database.fetch_named("map_code_index")
+            entries = {}
+            root = _TrieNode()
+            for row in rows:
+                map_code = row["map_code"]
+                entries[map_code] = MapCodeEntry(map_code, bool(row["archived"]), bool(row["official"]))
+                node = root
+                for char in map_code:
+                    node = node.children.setdefault(char, _TrieNode())
+                node.map_code = map_code
+            self._entries, self._root, self._fuzzy = entries, root, None
+            self._loaded = True
+            self._stale = generation != self._generation
+            log.debug("Rebuilt map code index with %d codes.", len(self._entries))
+
+    def _on_tables_changed(self, tables: frozenset[str] | None, _user_ids: frozenset[int] | None) -> None:
+        if tables is None or "maps" in tables:
+            self._generation += 1
+            self._stale = True
+
+
+def _log_rebuild_failure(task: asyncio.Task[None]) -> None:
+    if not task.cancelled() and (exc := task.exception()) is not None:
+        log.warning("Background map code index rebuild failed: %r", exc)
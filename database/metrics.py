@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import bisect
+import collections
+import datetime
+import functools
+import logging
+import math
+import re
+import typing
+import zlib
+
+log = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, math.inf)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def query_name(query: str) -> str:
+    """Derive a stable, readable name for an unnamed SQL query."""
+    collapsed = _WHITESPACE.sub(" ", query).strip()
+    checksum = zlib.crc32(collapsed.encode()) & 0xFFFFFF
+    if len(collapsed) > 48:  # noqa: PLR2004
+        collapsed = collapsed[:47] + "…"
+    return f"{collapsed} #{checksum:06x}"
+
+
+def redact(args: typing.Sequence[typing.Any]) -> tuple[str, ...]:
+    """Replace query arguments with their type so values never reach the logs."""
+    redacted = []
+    for arg in args:
+        if arg is None:
+            redacted.append("NULL")
+        elif isinstance(arg, (list, tuple, set)):
+            redacted.append(f"<{type(arg).__name__}[{len(arg)}]>")
+        else:
+            redacted.append(f"<{type(arg).__name__}>")
+    return tuple(redacted)
+
+
+class LatencyStats:
+    """Latency histogram and counters for a single query name."""
+
+    __slots__ = ("buckets", "calls", "failures", "max", "name", "rows", "total")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.failures = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def observe(self, elapsed: float, rows: int = 0, *, failed: bool = False) -> None:
+        self.calls += 1
+        self.rows += rows
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        if failed:
+            self.failures += 1
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+    @property
+    def mean_rows(self) -> float:
+        return self.rows / self.calls if self.calls else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Approximate a latency percentile using the upper bound of its histogram bucket."""
+        if not self.calls:
+            return 0.0
+        target = self.calls * percent / 100
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+class SlowQuery(typing.NamedTuple):
+    name: str
+    elapsed: float
+    rows: int
+    args: tuple[str, ...]
+    timestamp: datetime.datetime
+
+
+class QueryMetrics:
+    """In-process query instrumentation for `database.Database`.
+
+    Tracks per-query latency histograms, row counts and pool acquire wait time.
+    Queries slower than `slow_query_threshold` seconds are kept in a bounded
+    slow-query log with their arguments redacted.
+    """
+
+    def __init__(self, *, slow_query_threshold: float = 0.25, slow_query_log_size: int = 100) -> None:
+        self.slow_query_threshold = slow_query_threshold
+        self.queries: dict[str, LatencyStats] = {}
+        self.acquire = LatencyStats("pool.acquire")
+        self.acquire_timeouts = 0
+        self.slow_queries: collections.deque[SlowQuery] = collections.deque(maxlen=slow_query_log_size)
+        self.started_at = datetime.datetime.now(datetime.UTC)
+
+    def observe(
+        self,
+        name: str,
+        elapsed: float,
+        rows: int,
+        args: typing.Sequence[typing.Any],
+        *,
+        failed: bool = False,
+    ) -> None:
+        stats = self.queries.get(name)
+        if stats is None:
+            stats = self.queries[name] = LatencyStats(name)
+        stats.observe(elapsed, rows, failed=failed)
+        if elapsed >= self.slow_query_threshold:
+            redacted = redact(args)
+            self.slow_queries.append(SlowQuery(name, elapsed, rows, redacted, datetime.datetime.now(datetime.UTC)))
+            log.warning("Slow query (%.1fms, %d rows) %s args=%s", elapsed * 1000, rows, name, redacted)
+
+    def observe_acquire(self, elapsed: float, *, timed_out: bool = False) -> None:
+        self.acquire.observe(elapsed, failed=timed_out)
+        if timed_out:
+            self.acquire_timeouts += 1
+
+    def top(
+        self,
+        limit: int = 10,
+        *,
+        key: typing.Literal["total", "mean", "max", "calls", "rows"] = "total",
+    ) -> list[LatencyStats]:
+        """Get the top N queries sorted by the given statistic."""
+        sort_key = {
+            "total": lambda s: s.total,
+            "mean": lambda s: s.mean,
+            "max": lambda s: s.max,
+            "calls": lambda s: s.calls,
+            "rows": lambda s: s.rows,
+        }[key]
+        return sorted(self.queries.values(), key=sort_key, reverse=True)[:limit]
+
+    def reset(self) -> None:
+        self.queries.clear()
+        self.acquire = LatencyStats("pool.acquire")
+        self.acquire_timeouts = 0
+        self.slow_queries.clear()
+        self.started_at = datetime.datetime.now(datetime.UTC)
+
+
+def row_count(result: object, *, status: bool = False) -> int:
+    """Count the rows affected or returned by an asyncpg call result.
+
+    With `status`, a string result is the command status tag of `execute`, `executemany` or
+    a COPY, e.g. "UPDATE 3" or "INSERT 0 1". Any other scalar is a single value.
+    """
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    if status and isinstance(result, str):
+        _, _, count = result.rpartition(" ")
+        return int(count) if count.isdigit() else 0
+    return 1
@@ -0,0 +1,51 @@
+-- Table change notifications for the bot's cache invalidation listener (database/listener.py).
+--
+-- Migrations are applied by hand, in order, by someone with DDL rights:
+--     psql "$DSN" -v ON_ERROR_STOP=1 -f database/migrations/001_table_change_notify.sql
+-- Every migration is safe to run again.
+--
+-- Statement level triggers, so a bulk update sends one notification instead of one per row.
+-- Postgres also folds identical notifications sent within the same transaction. The payload is
+-- the changed table's name.
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION genji_notify_table_change() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('genji_table_changes', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    _table text;
+BEGIN
+    FOREACH _table IN ARRAY ARRAY[
+        'all_map_mechanics',
+        'all_map_names',
+        'all_map_restrictions',
+        'all_map_types',
+        'guides',
+        'map_creators',
+        'map_mechanics',
+        'map_medals',
+        'map_restrictions',
+        'maps',
+        'records',
+        'user_global_names',
+        'users'
+    ] LOOP
+        -- DROP and CREATE instead of CREATE OR REPLACE TRIGGER, which needs Postgres 14.
+        EXECUTE format('DROP TRIGGER IF EXISTS genji_notify_table_change ON %I', _table);
+        EXECUTE format(
+            'CREATE TRIGGER genji_notify_table_change
+             AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I
+             FOR EACH STATEMENT EXECUTE FUNCTION genji_notify_table_change()',
+            _table
+        );
+    END LOOP;
+END;
+$$;
+
+COMMIT;
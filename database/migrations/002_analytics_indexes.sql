@@ -0,0 +1,23 @@
+-- Indexes for the audit log, with and without a command filter, and the command name catalog.
+--
+-- CREATE INDEX CONCURRENTLY doesn't block the analytics inserts on this large table, but it
+-- can't run inside a transaction, so this migration has no BEGIN/COMMIT and needs psql:
+--     psql "$DSN" -v ON_ERROR_STOP=1 -f database/migrations/002_analytics_indexes.sql
+--
+-- A concurrent build that fails leaves an INVALID index behind, which IF NOT EXISTS would
+-- then skip forever. Those are dropped first, so running this again finishes the job.
+
+SELECT format('DROP INDEX CONCURRENTLY %s', i.indexrelid::regclass)
+FROM pg_index i
+WHERE NOT i.indisvalid
+    AND i.indexrelid IN (
+        to_regclass('analytics_event_date_collected_idx'),
+        to_regclass('analytics_date_collected_idx')
+    )
+\gexec
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS analytics_event_date_collected_idx
+    ON analytics (event, date_collected DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS analytics_date_collected_idx
+    ON analytics (date_collected DESC);
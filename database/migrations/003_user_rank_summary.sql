@@ -0,0 +1,25 @@
+-- Per user, per difficulty completion and medal counts, kept up to date by the bot
+-- (database/rank_summary.py):
+--     psql "$DSN" -v ON_ERROR_STOP=1 -f database/migrations/003_user_rank_summary.sql
+--
+-- The bot fills the table in the first time it starts and finds it empty. After that, ?rankrebuild
+-- recomputes everyone, e.g. after records were changed outside the bot.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS user_rank_summary (
+    user_id bigint NOT NULL,
+    difficulty text NOT NULL,
+    completions integer NOT NULL,
+    gold integer NOT NULL,
+    silver integer NOT NULL,
+    bronze integer NOT NULL,
+    rank_met boolean NOT NULL,
+    gold_rank_met boolean NOT NULL,
+    silver_rank_met boolean NOT NULL,
+    bronze_rank_met boolean NOT NULL,
+    updated_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (user_id, difficulty)
+);
+
+COMMIT;
@@ -0,0 +1,12 @@
+-- Progress of the skill role sync (utils/skill_roles.py), so a stopped ?skillsync run can resume:
+--     psql "$DSN" -v ON_ERROR_STOP=1 -f database/migrations/004_skill_role_sync.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS skill_role_sync (
+    guild_id bigint PRIMARY KEY,
+    last_user_id bigint NOT NULL,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+COMMIT;
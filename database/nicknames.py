@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import logging
+import typing
+
+if typing.TYPE_CHECKING:
+    from database.database import Database
+
+log = logging.getLogger(__name__)
+
+
+class NicknameLoader:
+    """Look up user nicknames in batches, with an LRU cache in front.
+
+    Lookups made in the same event loop iteration are coalesced into a single
+    `WHERE user_id = ANY($1)` query. Results, including unknown users, are cached until the
+    entry is evicted or the user's row changes. Writes that say which users they touched only
+    drop those users; any other change to `users` drops everyone.
+    """
+
+    def __init__(self, database: Database, *, max_size: int = 4096) -> None:
+        self.database = database
+        self.max_size = max_size
+        self._cache: collections.OrderedDict[int, str | None] = collections.OrderedDict()
+        self._pending: dict[int, asyncio.Future[str | None]] = {}
+        self._dispatch_scheduled = False
+        # Bumped on invalidation, so a batch that raced a rename doesn't cache the old name.
+        self._generation = 0
+        self._tasks: set[asyncio.Task[None]] = set()
+        database.add_invalidation_hook(self._on_tables_changed)
+
+    def __len__(self) -> int:
+        """Return the amount of cached nicknames."""
+        return len(self._cache)
+
+    async def load(self, user_id: int) -> str | None:
+        """Get a user's nickname, or None if the user doesn't exist."""
+        if user_id in self._cache:
+            self._cache.move_to_end(user_id)
+            return self._cache[user_id]
+
+        future = self._pending.get(user_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[user_id] = loop.create_future()
+            if not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                loop.call_soon(self._dispatch)
+        # One caller being cancelled must not cancel the lookup for everyone else.
+        return await asyncio.shield(future)
+
+    async def load_many(self, user_ids: typing.Iterable[int]) -> dict[int, str | None]:
+        """Get the nicknames of several users with at most one query."""
+        user_ids = list(dict.fromkeys(user_ids))
+        nicknames = await asyncio.gather(*(self.load(user_id) for user_id in user_ids))
+        return dict(zip(user_ids, nicknames))
+
+    def invalidate(self, user_id: int | None = None) -> None:
+        """Forget a cached nickname, or every nickname if `user_id` is None."""
+        self._generation += 1
+        if user_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(user_id, None)
+
+    def _on_tables_changed(self, tables: frozenset[str] | None, user_ids: frozenset[int] | None) -> None:
+        if tables is not None and "users" not in tables:
+            return
+        if user_ids is None:
+            self.invalidate()
+            return
+        for user_id in user_ids:
+            self.invalidate(user_id)
+
+    def _dispatch(self) -> None:
+        batch, self._pending = self._pending, {}
+        self._dispatch_scheduled = False
+        task = asyncio.create_task(self._fetch(batch, self._generation))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, batch: dict[int, asyncio.Future[str | None]], generation: int) -> None:
+        try:
+            rows = await self.database.fetch_named("user_nicknames", list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        found = {row["user_id"]: row["nickname"] for row in rows}
+        log.debug("Loaded %d nicknames in one query.", len(batch))
+        for user_id, future in batch.items():
+            nickname = found.get(user_id)
+            if generation == self._generation:
+                self._cache[user_id] = nickname
+            if not future.done():
+                future.set_result(nickname)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
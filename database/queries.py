@@ -0,0 +1,616 @@
+from __future__ import annotations
+
+import textwrap
+import typing
+
+from utils.ranks import RANK_THRESHOLDS, TOP_DIFFICULTIES_RANGES
+
+
+class NamedQuery(typing.NamedTuple):
+    """A query that is parsed once and executed by name.
+
+    Reads with a `cache_ttl` are cached by `database.Database`, tagged with the tables in `tags`.
+    """
+
+    name: str
+    sql: str
+    cache_ttl: float | None = None
+    tags: frozenset[str] = frozenset()
+
+
+class QueryRegistry:
+    """Holds every named query the bot runs.
+
+    Queries are dedented once at import time. Each pooled connection prepares them on
+    first use and keeps them in its statement cache.
+    """
+
+    def __init__(self) -> None:
+        self._queries: dict[str, NamedQuery] = {}
+
+    def register(
+        self,
+        name: str,
+        sql: str,
+        *,
+        cache_ttl: float | None = None,
+        tags: typing.Iterable[str] = (),
+    ) -> NamedQuery:
+        """Register a query under a unique name."""
+        if name in self._queries:
+            raise ValueError(f"A query named {name!r} is already registered.")
+        tags = frozenset(tags)
+        if cache_ttl is not None and not tags:
+            raise ValueError(f"Cached query {name!r} needs the tables it reads as tags.")
+        query = NamedQuery(name, textwrap.dedent(sql).strip(), cache_ttl, tags)
+        self._queries[name] = query
+        return query
+
+    def __getitem__(self, name: str) -> NamedQuery:
+        """Get a registered query by name."""
+        try:
+            return self._queries[name]
+        except KeyError:
+            raise KeyError(f"No query named {name!r} is registered.") from None
+
+    def __contains__(self, name: object) -> bool:
+        """Check if a query name is registered."""
+        return name in self._queries
+
+    def __iter__(self) -> typing.Iterator[NamedQuery]:
+        """Iterate over all registered queries."""
+        return iter(self._queries.values())
+
+    def __len__(self) -> int:
+        """Return the amount of registered queries."""
+        return len(self._queries)
+
+
+REGISTRY = QueryRegistry()
+register = REGISTRY.register
+
+
+# Users
+
+register("user_flags", "SELECT flags FROM users WHERE user_id = $1")
+
+register("user_flags_update", "UPDATE users SET flags = $1 WHERE user_id = $2")
+
+register(
+    "user_search_index",
+    """
+    SELECT
+        u.user_id,
+        u.nickname,
+        EXISTS(SELECT 1 FROM map_creators mc WHERE mc.user_id = u.user_id) AS is_creator
+    FROM users u
+    """,
+)
+
+register("user_nicknames", "SELECT user_id, nickname FROM users WHERE user_id = ANY($1::bigint[])")
+
+
+# Maps
+
+register("map_code_index", "SELECT map_code, archived, official FROM maps")
+register("map_code_lookup", "SELECT map_code, archived, official FROM maps WHERE map_code = $1")
+
+# Map option lookups. These tables only change when a new map type, name, etc. is added.
+
+register(
+    "map_type_options",
+    "SELECT name FROM all_map_types ORDER BY order_num",
+    cache_ttl=3600,
+    tags={"all_map_types"},
+)
+
+register(
+    "map_name_options",
+    "SELECT name FROM all_map_names ORDER BY name",
+    cache_ttl=3600,
+    tags={"all_map_names"},
+)
+
+register(
+    "mechanic_options",
+    "SELECT name FROM all_map_mechanics ORDER BY order_num",
+    cache_ttl=3600,
+    tags={"all_map_mechanics"},
+)
+
+register(
+    "restriction_options",
+    "SELECT name FROM all_map_restrictions ORDER BY order_num",
+    cache_ttl=3600,
+    tags={"all_map_restrictions"},
+)
+
+register(
+    "map_search",
+    """
+          WITH
+            completions AS (
+                SELECT DISTINCT ON (map_code)
+                    map_code,
+                    record,
+                    verified,
+                    inserted_at
+                FROM records
+                WHERE user_id = $10 AND legacy IS FALSE
+                ORDER BY map_code, inserted_at DESC
+            )
+        SELECT
+          am.map_name, map_type, am.map_code, am."desc", am.official,
+          am.archived, guide, mechanics, restrictions, am.checkpoints,
+          creators, difficulty, quality, creator_ids, am.gold, am.silver,
+          am.bronze, p.thread_id, pa.count, pa.required_votes,
+          c.map_code IS NOT NULL AS completed,
+          CASE
+            WHEN verified = TRUE AND c.record <= am.gold   THEN 'Gold'
+            WHEN verified = TRUE AND c.record <= am.silver THEN 'Silver'
+            WHEN verified = TRUE AND c.record <= am.bronze THEN 'Bronze'
+                                                           ELSE ''
+          END AS medal_type
+          FROM
+            all_maps am
+              LEFT JOIN completions c ON am.map_code = c.map_code
+              LEFT JOIN playtest p ON am.map_code = p.map_code AND p.is_author IS TRUE
+              LEFT JOIN playtest_avgs pa ON pa.map_code = am.map_code
+         WHERE
+             ($1::text IS NULL OR am.map_code = $1)
+         AND ($1::text IS NOT NULL OR ((archived = FALSE)
+           AND (official = $11::bool)
+           AND ($2::text IS NULL OR map_type LIKE $2)
+           AND ($3::text IS NULL OR map_name = $3)
+           AND ($4::text IS NULL OR mechanics LIKE $4)
+           AND ($13::text IS NULL OR restrictions LIKE $13)
+           AND ($5::numeric(10, 2) IS NULL OR $6::numeric(10, 2) IS NULL OR (difficulty >= $5::numeric(10, 2)
+             AND difficulty < $6::numeric(10, 2)))
+           AND ($7::int IS NULL OR quality >= $7)
+           AND ($8::bigint IS NULL OR $8 = ANY (creator_ids))
+           AND ($12::bool IS FALSE OR (gold IS NOT NULL AND silver IS NOT NULL AND bronze IS NOT NULL))))
+         GROUP BY
+           am.map_name, map_type, am.map_code, am."desc", am.official, am.archived, guide, mechanics,
+           restrictions, am.checkpoints, creators, difficulty, quality, creator_ids, am.gold, am.silver,
+           am.bronze, c.map_code IS NOT NULL, c.record, verified, p.thread_id, pa.count, pa.required_votes
+        HAVING
+            ($9::bool IS NULL OR c.map_code IS NOT NULL = $9)
+        ORDER BY
+            difficulty, quality DESC;
+    """,
+)
+
+# Every row of a new map submission in one statement. Foreign keys are checked at the end of
+# the statement, so the child rows can reference the map inserted alongside them.
+register(
+    "map_submission_insert",
+    """
+    WITH
+        new_map AS (
+            INSERT INTO maps (map_name, map_type, map_code, "desc", official, checkpoints)
+            VALUES ($2::text, $3::text[], $1::text, $4::text, $5::bool, $6::int)
+        ),
+        new_mechanics AS (
+            INSERT INTO map_mechanics (map_code, mechanic)
+            SELECT $1::text, mechanic FROM unnest($7::text[]) AS mechanic
+        ),
+        new_restrictions AS (
+            INSERT INTO map_restrictions (map_code, restriction)
+            SELECT $1::text, restriction FROM unnest($8::text[]) AS restriction
+        ),
+        new_creator AS (
+            INSERT INTO map_creators (map_code, user_id)
+            VALUES ($1::text, $9::bigint)
+        ),
+        new_rating AS (
+            INSERT INTO map_ratings (map_code, user_id, difficulty)
+            VALUES ($1::text, $9::bigint, $10::numeric)
+        ),
+        new_guides AS (
+            INSERT INTO guides (map_code, url)
+            SELECT $1::text, url FROM unnest($11::text[]) AS url
+        ),
+        new_medals AS (
+            INSERT INTO map_medals (gold, silver, bronze, map_code)
+            SELECT $12::numeric, $13::numeric, $14::numeric, $1::text
+            WHERE $15::bool
+        )
+    INSERT INTO map_submission_dates (user_id, map_code)
+    SELECT $9::bigint, $1::text
+    WHERE NOT $5::bool
+    """,
+)
+
+
+# Records
+
+register(
+    "leaderboard_records",
+    """
+        WITH map_creators_agg AS (
+            SELECT mc.map_code, array_agg(DISTINCT u.nickname) AS creators
+            FROM map_creators mc
+            LEFT JOIN users u ON mc.user_id = u.user_id
+            GROUP BY mc.map_code
+        ),
+        map_records AS (
+            SELECT
+                u.nickname,
+                r.user_id,
+                record,
+                screenshot,
+                video,
+                r.map_code,
+                r.channel_id,
+                r.message_id,
+                m.map_name,
+                avg(difficulty) as difficulty,
+                rank() OVER (
+                    PARTITION BY r.map_code, r.user_id
+                    ORDER BY r.inserted_at DESC
+                ) AS latest,
+                gold,
+                silver,
+                bronze,
+                r.verified,
+                completion,
+                creators
+                FROM records r
+                    LEFT JOIN users u ON r.user_id = u.user_id
+                    LEFT JOIN maps m ON m.map_code = r.map_code
+                    LEFT JOIN map_ratings mr ON m.map_code = mr.map_code
+                    LEFT JOIN map_medals mm ON m.map_code = mm.map_code
+                    LEFT JOIN map_creators_agg mca ON mca.map_code = m.map_code
+                WHERE mr.verified AND r.verified AND ($1::text IS NULL OR $1::text = r.map_code) AND NOT legacy
+                GROUP BY u.nickname, record, screenshot, video, r.map_code,
+                    r.channel_id, r.message_id, m.map_name, gold, silver,
+                    bronze, inserted_at, r.user_id, r.verified, completion, r.user_id, creators
+        ), ranked_records AS (
+            SELECT
+                *,
+                RANK() OVER (PARTITION BY map_code ORDER BY completion, record) as rank_num
+            FROM map_records
+            WHERE map_records.latest = 1 AND (
+                $1::text IS NULL OR (
+                    ($2::text != 'Fully Verified' OR (NOT completion AND video IS NOT NULL))
+                AND ($2::text != 'Verified' OR (NOT completion AND NOT video IS NOT NULL))
+                AND ($2::text != 'Completions' OR (completion))
+                )
+            )
+            ORDER BY difficulty, map_code
+        )
+        SELECT * FROM ranked_records
+        WHERE $3::bigint IS NULL OR (
+            user_id=$3::bigint
+                AND ($4::text != 'World Records' OR rank_num = 1 AND NOT completion AND video IS NOT NULL)
+                AND ($4::text != 'Records' OR NOT completion)
+                AND ($4::text != 'Completions' OR completion)
+        )
+    """,
+)
+
+
+def _ranked_difficulties() -> tuple[str, str]:
+    """Build the bodies of the `ranges` and `thresholds` CTEs from `utils.ranks`.
+
+    `ranges` maps average difficulty ratings to ranked difficulties, counting Beginner maps as Easy.
+    `thresholds` has the completions each rank needs and its position in rank order.
+    """
+    ranges = []
+    thresholds = []
+    lower = 0.0
+    for position, (name, threshold) in enumerate(RANK_THRESHOLDS.items(), 1):
+        upper = TOP_DIFFICULTIES_RANGES[name][1]
+        close = "]" if position == len(RANK_THRESHOLDS) else ")"
+        ranges.append(f"('[{lower},{upper}{close}'::numrange, '{name}')")
+        thresholds.append(f"('{name}', {threshold}, {position})")
+        lower = upper
+    return (
+        f'SELECT range, name FROM (VALUES {", ".join(ranges)}) AS ranges("range", "name")',
+        f"SELECT * FROM (VALUES {', '.join(thresholds)}) AS t(name, threshold, position)",
+    )
+
+
+_RANGES, _THRESHOLDS = _ranked_difficulties()
+
+
+register(
+    "user_rank_data",
+    f"""
+        WITH unioned_records AS (
+            SELECT DISTINCT ON (map_code, user_id)
+                map_code,
+                user_id,
+                record,
+                screenshot,
+                video,
+                verified,
+                message_id,
+                channel_id,
+                completion,
+                legacy_medal AS medal
+            FROM records
+            ORDER BY map_code, user_id, inserted_at DESC
+        ),
+        ranges AS ({_RANGES}),
+        thresholds AS ({_THRESHOLDS}),
+        map_data AS (
+            SELECT DISTINCT ON (m.map_code, r.user_id)
+                AVG(mr.difficulty) AS difficulty,
+                r.verified = TRUE AND r.video IS NOT NULL AND(
+                    record <= gold OR medal LIKE 'Gold'
+                    ) AS gold,
+                r.verified = TRUE AND r.video IS NOT NULL AND(
+                    record <= silver AND record > gold OR medal LIKE 'Silver'
+                    ) AS silver,
+                r.verified = TRUE AND r.video IS NOT NULL AND(
+                    record <= bronze AND record > silver OR medal LIKE 'Bronze'
+                ) AS bronze
+            FROM unioned_records r
+            LEFT JOIN maps m ON r.map_code = m.map_code
+            LEFT JOIN map_ratings mr ON m.map_code = mr.map_code
+            LEFT JOIN map_medals mm ON r.map_code = mm.map_code
+            WHERE r.user_id = $1
+              AND m.official = TRUE
+              AND ($2 IS TRUE OR m.archived = FALSE)
+            GROUP BY m.map_code, record, gold, silver, bronze, r.verified, medal, r.user_id, r.video
+        ), counts_data AS (
+        SELECT
+            r.name AS difficulty,
+            count(r.name) AS completions,
+            count(CASE WHEN gold THEN 1 END) AS gold,
+            count(CASE WHEN silver THEN 1 END) AS silver,
+            count(CASE WHEN bronze THEN 1 END) AS bronze,
+            -- Use threshold for rank comparison
+            count(r.name) >= t.threshold AS rank_met,
+            count(CASE WHEN gold THEN 1 END) >= t.threshold AS gold_rank_met,
+            count(CASE WHEN silver THEN 1 END) >= t.threshold AS silver_rank_met,
+            count(CASE WHEN bronze THEN 1 END) >= t.threshold AS bronze_rank_met
+        FROM ranges r
+        INNER JOIN map_data md ON r.range @> md.difficulty
+        INNER JOIN thresholds t ON r.name = t.name
+        GROUP BY r.name, t.threshold
+        )
+        SELECT
+            name AS difficulty,
+            coalesce(completions, 0) AS completions,
+            coalesce(gold, 0) AS gold,
+            coalesce(silver, 0) AS silver,
+            coalesce(bronze, 0) AS bronze,
+            coalesce(rank_met, FALSE) AS rank_met,
+            coalesce(gold_rank_met, FALSE) AS gold_rank_met,
+            coalesce(silver_rank_met, FALSE) AS silver_rank_met,
+            coalesce(bronze_rank_met, FALSE) AS bronze_rank_met
+        FROM thresholds t
+        LEFT JOIN counts_data cd ON t.name = cd.difficulty
+        ORDER BY t.position;
+    """,
+)
+
+
+def _users_rank_data(users: str, include_archived: str) -> str:
+    """Build the rank data query for every user in the `users` bigint[] SQL expression.
+
+    Same as user_rank_data, with a row per difficulty for users without completions.
+    """
+    return f"""
+        WITH unioned_records AS (
+            SELECT DISTINCT ON (map_code, user_id)
+                map_code,
+                user_id,
+                record,
+                video,
+                verified,
+                legacy_medal AS medal
+            FROM records
+            WHERE user_id = ANY({users})
+            ORDER BY map_code, user_id, inserted_at DESC
+        ),
+        ranges AS ({_RANGES}),
+        thresholds AS ({_THRESHOLDS}),
+        map_data AS (
+            SELECT
+                r.user_id,
+                AVG(mr.difficulty) AS difficulty,
+                r.verified = TRUE AND r.video IS NOT NULL AND(
+                    record <= gold OR medal LIKE 'Gold'
+                    ) AS gold,
+                r.verified = TRUE AND r.video IS NOT NULL AND(
+                    record <= silver AND record > gold OR medal LIKE 'Silver'
+                    ) AS silver,
+                r.verified = TRUE AND r.video IS NOT NULL AND(
+                    record <= bronze AND record > silver OR medal LIKE 'Bronze'
+                ) AS bronze
+            FROM unioned_records r
+            LEFT JOIN maps m ON r.map_code = m.map_code
+            LEFT JOIN map_ratings mr ON m.map_code = mr.map_code
+            LEFT JOIN map_medals mm ON r.map_code = mm.map_code
+            WHERE m.official = TRUE
+              AND ({include_archived} IS TRUE OR m.archived = FALSE)
+            GROUP BY m.map_code, record, gold, silver, bronze, r.verified, medal, r.user_id, r.video
+        ), counts_data AS (
+        SELECT
+            md.user_id,
+            r.name AS difficulty,
+            count(r.name) AS completions,
+            count(CASE WHEN gold THEN 1 END) AS gold,
+            count(CASE WHEN silver THEN 1 END) AS silver,
+            count(CASE WHEN bronze THEN 1 END) AS bronze
+        FROM ranges r
+        INNER JOIN map_data md ON r.range @> md.difficulty
+        GROUP BY md.user_id, r.name
+        )
+        SELECT
+            u.user_id,
+            t.name AS difficulty,
+            coalesce(cd.completions, 0) AS completions,
+            coalesce(cd.gold, 0) AS gold,
+            coalesce(cd.silver, 0) AS silver,
+            coalesce(cd.bronze, 0) AS bronze,
+            coalesce(cd.completions, 0) >= t.threshold AS rank_met,
+            coalesce(cd.gold, 0) >= t.threshold AS gold_rank_met,
+            coalesce(cd.silver, 0) >= t.threshold AS silver_rank_met,
+            coalesce(cd.bronze, 0) >= t.threshold AS bronze_rank_met
+        FROM unnest({users}) AS u(user_id)
+        CROSS JOIN thresholds t
+        LEFT JOIN counts_data cd ON cd.user_id = u.user_id AND cd.difficulty = t.name
+    """
+
+
+register(
+    "users_rank_data",
+    _users_rank_data("$1::bigint[]", "$2") + "ORDER BY u.user_id, t.position",
+)
+
+# user_rank_summary is created by database/migrations/003_user_rank_summary.sql.
+# Writes only the rows that changed, returning the users they belong to.
+_RANK_SUMMARY_UPSERT = """
+    INSERT INTO user_rank_summary (
+        user_id, difficulty, completions, gold, silver, bronze,
+        rank_met, gold_rank_met, silver_rank_met, bronze_rank_met
+    )
+    SELECT
+        user_id, difficulty, completions, gold, silver, bronze,
+        rank_met, gold_rank_met, silver_rank_met, bronze_rank_met
+    FROM fresh
+    ON CONFLICT (user_id, difficulty) DO UPDATE
+    SET
+        completions = excluded.completions,
+        gold = excluded.gold,
+        silver = excluded.silver,
+        bronze = excluded.bronze,
+        rank_met = excluded.rank_met,
+        gold_rank_met = excluded.gold_rank_met,
+        silver_rank_met = excluded.silver_rank_met,
+        bronze_rank_met = excluded.bronze_rank_met,
+        updated_at = now()
+    WHERE (
+        user_rank_summary.completions, user_rank_summary.gold, user_rank_summary.silver,
+        user_rank_summary.bronze, user_rank_summary.rank_met, user_rank_summary.gold_rank_met,
+        user_rank_summary.silver_rank_met, user_rank_summary.bronze_rank_met
+    ) IS DISTINCT FROM (
+        excluded.completions, excluded.gold, excluded.silver,
+        excluded.bronze, excluded.rank_met, excluded.gold_rank_met,
+        excluded.silver_rank_met, excluded.bronze_rank_met
+    )
+    RETURNING user_id
+"""
+
+register(
+    "rank_summary_refresh",
+    f"""
+    WITH fresh AS ({_users_rank_data("$1::bigint[]", "TRUE")}),
+    changed AS ({_RANK_SUMMARY_UPSERT})
+    SELECT count(DISTINCT user_id) FROM changed
+    """,
+)
+
+register(
+    "rank_summary_rebuild",
+    f"""
+    WITH fresh AS ({_users_rank_data("ARRAY(SELECT DISTINCT user_id FROM records)", "TRUE")}),
+    changed AS ({_RANK_SUMMARY_UPSERT}),
+    removed AS (
+        DELETE FROM user_rank_summary s
+        WHERE NOT EXISTS (SELECT 1 FROM fresh f WHERE f.user_id = s.user_id)
+        RETURNING user_id
+    )
+    SELECT count(DISTINCT user_id)
+    FROM (SELECT user_id FROM changed UNION ALL SELECT user_id FROM removed) AS out_of_date
+    """,
+)
+
+# Users without a summary, e.g. without any records, get a row of zeroes per difficulty.
+register(
+    "users_rank_summary",
+    f"""
+    WITH thresholds AS ({_THRESHOLDS})
+    SELECT
+        u.user_id,
+        t.name AS difficulty,
+        coalesce(s.completions, 0) AS completions,
+        coalesce(s.gold, 0) AS gold,
+        coalesce(s.silver, 0) AS silver,
+        coalesce(s.bronze, 0) AS bronze,
+        coalesce(s.rank_met, FALSE) AS rank_met,
+        coalesce(s.gold_rank_met, FALSE) AS gold_rank_met,
+        coalesce(s.silver_rank_met, FALSE) AS silver_rank_met,
+        coalesce(s.bronze_rank_met, FALSE) AS bronze_rank_met
+    FROM unnest($1::bigint[]) AS u(user_id)
+    CROSS JOIN thresholds t
+    LEFT JOIN user_rank_summary s ON s.user_id = u.user_id AND s.difficulty = t.name
+    ORDER BY u.user_id, t.position
+    """,
+)
+
+
+# Every user's latest record on every official map, for utils.rank_engine.
+register(
+    "rank_engine_snapshot",
+    """
+    WITH latest AS (
+        SELECT DISTINCT ON (map_code, user_id)
+            map_code, user_id, record, video, verified, legacy_medal
+        FROM records
+        ORDER BY map_code, user_id, inserted_at DESC
+    )
+    SELECT
+        l.user_id,
+        avg(mr.difficulty) AS difficulty,
+        l.record,
+        mm.gold,
+        mm.silver,
+        mm.bronze,
+        l.verified AND l.video IS NOT NULL AS medal_eligible,
+        l.legacy_medal
+    FROM latest l
+    JOIN maps m ON m.map_code = l.map_code
+    LEFT JOIN map_ratings mr ON mr.map_code = l.map_code
+    LEFT JOIN map_medals mm ON mm.map_code = l.map_code
+    WHERE m.official = TRUE
+      AND ($1 IS TRUE OR m.archived = FALSE)
+    GROUP BY l.map_code, l.user_id, l.record, mm.gold, mm.silver, mm.bronze, l.verified, l.video, l.legacy_medal
+    """,
+)
+
+
+# Analytics
+
+# Emulates a skip scan over the (event, date_collected) index, one index probe per distinct name.
+register(
+    "analytics_event_names",
+    """
+    WITH RECURSIVE events AS (
+        (SELECT event FROM analytics ORDER BY event LIMIT 1)
+        UNION ALL
+        SELECT (SELECT a.event FROM analytics a WHERE a.event > e.event ORDER BY a.event LIMIT 1)
+        FROM events e
+        WHERE e.event IS NOT NULL
+    )
+    SELECT event FROM events WHERE event IS NOT NULL
+    """,
+)
+
+# Split by whether an event is given, so each can walk an index in date order and stop at the limit.
+# The indexes are created by database/migrations/002_analytics_indexes.sql.
+register(
+    "audit_log",
+    """
+    SELECT *
+    FROM analytics
+    WHERE event NOT IN ('sync', 'audit-log') AND event NOT LIKE 'jsk%'
+    ORDER BY date_collected DESC
+    LIMIT $1
+    """,
+)
+
+register(
+    "audit_log_event",
+    """
+    SELECT *
+    FROM analytics
+    WHERE event = $2 AND event NOT IN ('sync', 'audit-log') AND event NOT LIKE 'jsk%'
+    ORDER BY date_collected DESC
+    LIMIT $1
+    """,
+)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import logging
+import typing
+
+if typing.TYPE_CHECKING:
+    from database.database import Database, DotRecord
+
+log = logging.getLogger(__name__)
+
+
+class RankSummary:
+    """Per user, per difficulty completion and medal counts, kept in `user_rank_summary`.
+
+    The summary counts archived maps, like the skill role and `/summary` lookups. Writes that
+    change someone's rank refresh just the users they touch: `refresh_users` after a record is
+    submitted, verified or removed, `refresh_map` after a map's records or difficulty change.
+    `rebuild` recomputes every user. It only runs on startup when the table is empty, and
+    otherwise through `?rankrebuild`. Until `setup` finishes, `ready` is False and lookups
+    should compute ranks directly.
+
+    The table is created by `database/migrations/003_user_rank_summary.sql`.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self.database = database
+        self.ready = False
+        self._available = False
+
+    async def setup(self) -> None:
+        """Check that the summary table exists, and fill it in if it's empty."""
+        if await self.database.fetchval("SELECT to_regclass('user_rank_summary') IS NULL"):
+            log.warning(
+                "The rank summary table is missing, so ranks are computed directly. "
+                "Apply database/migrations/003_user_rank_summary.sql."
+            )
+            return
+        self._available = True
+        if not await self.database.fetchval("SELECT EXISTS (SELECT 1 FROM user_rank_summary)"):
+            changed = await self.rebuild()
+            log.info("Rank summary filled in for %d users.", changed)
+        self.ready = True
+
+    async def rebuild(self) -> int:
+        """Recompute the summary for every user, returning how many users were out of date."""
+        return typing.cast("int", await self.database.fetchval_named("rank_summary_rebuild"))
+
+    async def refresh_users(self, user_ids: typing.Iterable[int]) -> int:
+        """Recompute the summary for some users, returning how many of them changed."""
+        user_ids = list(user_ids)
+        if not user_ids or not self._available:
+            return 0
+        return typing.cast("int", await self.database.fetchval_named("rank_summary_refresh", user_ids))
+
+    async def refresh_map(self, map_code: str) -> int:
+        """Recompute the summary for every user with a record on a map."""
+        rows = await self.database.fetch("SELECT DISTINCT user_id FROM records WHERE map_code = $1", map_code)
+        return await self.refresh_users(row["user_id"] for row in rows)
+
+    async def fetch(self, user_ids: typing.Sequence[int], *, readonly: bool = False) -> list[DotRecord]:
+        """Fetch a row per difficulty for each user, ordered by user and difficulty."""
+        return await self.database.fetch_named("users_rank_summary", list(user_ids), readonly=readonly)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+import typing
+
+import asyncpg
+
+log = logging.getLogger(__name__)
+
+# Replay lag in seconds, or 0 when the replica has applied everything it has received.
+_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+# Connection-level errors that mean the replica itself is unusable, rather than the query being
+# wrong or slow. Timeouts are a subclass of OSError, so callers must let them through first: a
+# slow query or a saturated replica pool isn't a reason to take the replica out of rotation.
+# Client-side InterfaceErrors, e.g. about a released connection, are bugs rather than outages.
+REPLICA_FAILURES = (
+    OSError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.CannotConnectNowError,
+)
+
+
+class Replica:
+    """A read replica pool and its last known health."""
+
+    __slots__ = ("checked_at", "healthy", "lag", "name", "pool")
+
+    def __init__(self, name: str, pool: asyncpg.Pool) -> None:
+        self.name = name
+        self.pool = pool
+        self.healthy = False
+        self.lag: float | None = None
+        self.checked_at = 0.0
+
+
+class ReplicaRouter:
+    """Pick a healthy read replica for read-only queries.
+
+    Replica health is refreshed in the background at most every `check_interval` seconds.
+    A replica is skipped while it is unreachable or lagging more than `max_lag` seconds
+    behind the primary, in which case callers fall back to the primary pool.
+    Replicas start out unchecked, so reads go to the primary until the first check passes.
+    """
+
+    def __init__(
+        self,
+        pools: typing.Sequence[asyncpg.Pool],
+        *,
+        max_lag: float = 5.0,
+        check_interval: float = 10.0,
+        check_timeout: float = 2.0,
+    ) -> None:
+        self.replicas = [Replica(f"replica-{i}", pool) for i, pool in enumerate(pools)]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._refresh_task: asyncio.Task[None] | None = None
+
+    def pick(self) -> Replica | None:
+        """Get the next healthy replica, or None if reads should go to the primary."""
+        if self._cycle is None:
+            return None
+        self._schedule_refresh()
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica.healthy:
+                return replica
+        return None
+
+    def mark_down(self, replica: Replica, exc: BaseException) -> None:
+        """Take a replica out of rotation until its next successful health check."""
+        if replica.healthy:
+            log.warning("Read replica %s failed, falling back to primary: %r", replica.name, exc)
+        replica.healthy = False
+        replica.checked_at = time.monotonic()
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        now = time.monotonic()
+        if all(now - replica.checked_at < self.check_interval for replica in self.replicas):
+            return
+        self._refresh_task = asyncio.create_task(self.refresh())
+
+    async def refresh(self) -> None:
+        """Check replication lag on every replica that is due for a check."""
+        now = time.monotonic()
+        due = [replica for replica in self.replicas if now - replica.checked_at >= self.check_interval]
+        await asyncio.gather(*(self._check(replica) for replica in due))
+
+    async def _check(self, replica: Replica) -> None:
+        try:
+            lag = await asyncio.wait_for(replica.pool.fetchval(_LAG_QUERY), self.check_timeout)
+        except (asyncio.TimeoutError, *REPLICA_FAILURES) as e:
+            self.mark_down(replica, e)
+            return
+        finally:
+            replica.checked_at = time.monotonic()
+
+        replica.lag = float(lag)
+        healthy = replica.lag <= self.max_lag
+        if healthy != replica.healthy:
+            log.info("Read replica %s is %s (lag %.1fs)", replica.name, "up" if healthy else "lagging", replica.lag)
+        replica.healthy = healthy
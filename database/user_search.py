@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import typing
+
+from utils.search import KeyedTrigramIndex
+
+if typing.TYPE_CHECKING:
+    from database.database import Database
+
+log = logging.getLogger(__name__)
+
+# Users without a Discord account get small ids.
+FAKE_USER_ID_LIMIT = 10_000_000
+
+UserView = typing.Literal["all", "fake", "creators"]
+
+
+class _Snapshot(typing.NamedTuple):
+    nicknames: KeyedTrigramIndex[int]
+    fake: set[int]
+    creators: set[int]
+
+
+def _build(rows: list[typing.Any]) -> _Snapshot:
+    return _Snapshot(
+        KeyedTrigramIndex((row["user_id"], row["nickname"]) for row in rows if row["nickname"] is not None),
+        {row["user_id"] for row in rows if _is_fake_user(row["user_id"])},
+        {row["user_id"] for row in rows if row["is_creator"]},
+    )
+
+
+class UserSearchIndex:
+    """Fuzzy nickname search over every user, with views for fake users and map creators.
+
+    Nickname changes, new fake users and new map creators made through the bot are applied
+    in place. Other changes to `users` or `map_creators` mark the index stale, and it is
+    rebuilt in the background at most once per `min_rebuild_interval` seconds, while searches
+    keep using the current one. Building runs in a thread, since the user base can be large.
+    """
+
+    def __init__(self, database: Database, *, min_rebuild_interval: float = 60.0) -> None:
+        self.database = database
+        self.min_rebuild_interval = min_rebuild_interval
+        self._snapshot: _Snapshot | None = None
+        self._stale = True
+        self._rebuilt_at = 0.0
+        self._lock = asyncio.Lock()
+        self._rebuild_task: asyncio.Task[None] | None = None
+        # Changes applied while a rebuild is running, replayed onto the new snapshot.
+        self._journal: list[typing.Callable[[_Snapshot], None]] | None = None
+        database.add_invalidation_hook(self._on_tables_changed)
+
+    async def search(self, query: str, limit: int = 10, *, view: UserView = "all") -> list[tuple[int, str]]:
+        """Get the `limit` users whose nickname best matches `query`, as `(user_id, nickname)`."""
+        if self._snapshot is None:
+            await self._rebuild()
+        elif self._stale and time.monotonic() - self._rebuilt_at >= self.min_rebuild_interval:
+            self._schedule_rebuild()
+
+        snapshot = self._snapshot
+        keys = {"all": None, "fake": snapshot.fake, "creators": snapshot.creators}[view]
+        return snapshot.nicknames.search(query, limit, keys)
+
+    def put(self, user_id: int, nickname: str) -> None:
+        """Add a user or change their nickname."""
+        self._apply(lambda snapshot: _put(snapshot, user_id, nickname))
+
+    def add_creator(self, user_id: int) -> None:
+        """Mark a user as a map creator."""
+        self._apply(lambda snapshot: snapshot.creators.add(user_id))
+
+    def _apply(self, change: typing.Callable[[_Snapshot], None]) -> None:
+        if self._snapshot is not None:
+            change(self._snapshot)
+        if self._journal is not None:
+            self._journal.append(change)
+
+    def _schedule_rebuild(self) -> None:
+        if self._rebuild_task is None or self._rebuild_task.done():
+            self._rebuild_task = asyncio.create_task(self._rebuild())
+            self._rebuild_task.add_done_callback(_log_rebuild_failure)
+
+    async def _rebuild(self) -> None:
+        async with self._lock:
+            if self._snapshot is not None and not self._stale:
+                return
+            self._stale = False
+            self._journal = []
+            try:
+                rows = await self.database.fetch_named("user_search_index")
+                snapshot = await asyncio.to_thread(_build, rows)
+                for change in self._journal:
+                    change(snapshot)
+            except BaseException:
+                self._stale = True
+                raise
+            finally:
+                self._journal = None
+            self._snapshot = snapshot
+            self._rebuilt_at = time.monotonic()
+            log.debug("Rebuilt user search index with %d users.", len(snapshot.nicknames))
+
+    def _on_tables_changed(self, tables: frozenset[str] | None, _user_ids: frozenset[int] | None) -> None:
+        if tables is None or "users" in tables or "map_creators" in tables:
+            self._stale = True
+
+
+def _is_fake_user(user_id: int) -> bool:
+    return user_id < FAKE_USER_ID_LIMIT
+
+
+def _put(snapshot: _Snapshot, user_id: int, nickname: str) -> None:
+    snapshot.nicknames.put(user_id, nickname)
+    if _is_fake_user(user_id):
+        snapshot.fake.add(user_id)
+
+
+def _log_rebuild_failure(task: asyncio.Task[None]) -> None:
+    if not task.cancelled() and (exc := task.exception()) is not None:
+        log.warning("Background user search index rebuild failed: %r", exc)
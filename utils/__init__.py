@@ -1,28 +1,44 @@
 from . import (
+    autocomplete,
     constants,
     embeds,
     errors,
     formatter,
     map_submission,
     maps,
+    options,
     rabbit,
+    rank_engine,
     ranks,
+    ratelimit,
     records,
+    roles,
+    search,
+    skill_roles,
     transformers,
+    urls,
     utils,
     xp,
 )
 
 __all__ = [
+    "autocomplete",
     "constants",
     "embeds",
     "errors",
     "formatter",
     "map_submission",
     "maps",
+    "options",
+    "rank_engine",
     "ranks",
+    "ratelimit",
     "records",
+    "roles",
+    "search",
+    "skill_roles",
     "transformers",
+    "urls",
     "utils",
     "rabbit",
     "xp",
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import typing
+
+import discord
+
+if typing.TYPE_CHECKING:
+    from discord import app_commands
+
+    import core
+
+log = logging.getLogger(__name__)
+
+_Choices = list["app_commands.Choice[typing.Any]"]
+_AutocompleteCallback = typing.Callable[
+    [typing.Any, "discord.Interaction[core.Genji]", str], typing.Awaitable[_Choices]
+]
+
+# Discord drops autocomplete responses that arrive more than 3 seconds after the interaction.
+DEFAULT_DEADLINE = 2.5
+
+
+class _Work:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task[_Choices]) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class _Request:
+    __slots__ = ("superseded", "work")
+
+    def __init__(self, work: _Work, superseded: asyncio.Future[None]) -> None:
+        self.work = work
+        self.superseded = superseded
+
+
+class AutocompleteDispatcher:
+    """Run autocomplete callbacks without wasting work on responses nobody will see.
+
+    - A new keystroke for the same user, command and option supersedes the request before it.
+      The old request answers with no choices, and its lookup is cancelled unless another
+      request is waiting on it.
+    - Concurrent requests for the same lookup share a single run.
+    - Requests that can't be answered before Discord's deadline answer with no choices.
+    """
+
+    def __init__(self, *, deadline: float = DEFAULT_DEADLINE) -> None:
+        self.deadline = deadline
+        self.deduplicated = 0
+        self.superseded = 0
+        self.expired = 0
+        self._work: dict[typing.Hashable, _Work] = {}
+        self._requests: dict[tuple[int, str, str], _Request] = {}
+
+    async def run(
+        self,
+        itx: discord.Interaction[core.Genji],
+        key: typing.Hashable,
+        factory: typing.Callable[[], typing.Awaitable[_Choices]],
+    ) -> _Choices:
+        """Answer an autocomplete interaction with the result of `factory`.
+
+        Requests with equal `key`s are considered identical and share a run of `factory`.
+        """
+        remaining = self.deadline - (discord.utils.utcnow() - itx.created_at).total_seconds()
+        if remaining <= 0:
+            self.expired += 1
+            return []
+
+        work = self._work.get(key)
+        if work is None:
+            work = _Work(asyncio.create_task(factory()))
+            self._work[key] = work
+            work.task.add_done_callback(functools.partial(self._finished, key, work))
+        else:
+            self.deduplicated += 1
+        work.waiters += 1
+
+        slot = (itx.user.id, itx.command.qualified_name if itx.command else "", _focused_option(itx))
+        request = _Request(work, asyncio.get_running_loop().create_future())
+        if (previous := self._requests.get(slot)) is not None:
+            self._supersede(previous)
+        self._requests[slot] = request
+
+        try:
+            done, _ = await asyncio.wait(
+                (work.task, request.superseded),
+                timeout=remaining,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            if self._requests.get(slot) is request:
+                del self._requests[slot]
+            if not request.superseded.done():
+                request.superseded.set_result(None)
+                self._release(work)
+
+        if work.task in done and not work.task.cancelled():
+            return work.task.result()
+        if not done:
+            self.expired += 1
+            log.debug("Autocomplete for %s timed out.", slot)
+        return []
+
+    def _supersede(self, request: _Request) -> None:
+        if not request.superseded.done():
+            self.superseded += 1
+            request.superseded.set_result(None)
+            self._release(request.work)
+
+    def _release(self, work: _Work) -> None:
+        work.waiters -= 1
+        if work.waiters <= 0 and not work.task.done():
+            work.task.cancel()
+
+    def _finished(self, key: typing.Hashable, work: _Work, task: asyncio.Task[_Choices]) -> None:
+        if self._work.get(key) is work:
+            del self._work[key]
+        if not task.cancelled() and (exc := task.exception()) is not None and work.waiters <= 0:
+            log.warning("Autocomplete lookup failed after every request gave up on it: %r", exc)
+
+
+def _focused_option(itx: discord.Interaction) -> str:
+    options = (itx.data or {}).get("options", [])
+    while options:
+        for option in options:
+            if option.get("focused"):
+                return option["name"]
+        # Subcommands nest their options.
+        options = [nested for option in options for nested in option.get("options", [])]
+    return ""
+
+
+def dispatch_autocomplete(*, per_user: bool = False) -> typing.Callable[[_AutocompleteCallback], _AutocompleteCallback]:
+    """Run an autocomplete method through the bot's `AutocompleteDispatcher`.
+
+    Lookups are shared between requests for the same method, guild and input. Set `per_user`
+    when the choices also depend on who is typing.
+    """
+
+    def decorator(func: _AutocompleteCallback) -> _AutocompleteCallback:
+        @functools.wraps(func)
+        async def wrapper(self: object, itx: discord.Interaction[core.Genji], current: str) -> _Choices:
+            key = (func.__qualname__, itx.guild_id, itx.user.id if per_user else None, current)
+            return await itx.client.autocomplete.run(itx, key, lambda: func(self, itx, current))
+
+        return wrapper
+
+    return decorator
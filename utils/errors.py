@@ -25,6 +25,10 @@ class DatabaseConnectionError(Exception):
     """Connection failed. This will be logged. Try again later."""
 
 
+class DatabaseBusyError(BaseParkourError, app_commands.errors.AppCommandError):
+    """The database is busy right now. Please try again in a moment."""
+
+
 class IncorrectRecordFormatError(BaseParkourError, app_commands.errors.AppCommandError):
     """Record must be in XXXX.xx format e.g. 1569.33, 567.01, 10.50, etc."""
 
@@ -196,6 +196,7 @@ async def add_creator_(
         map_code,
         creator,
     )
+    itx.client.database.user_search.add_creator(creator)
     nickname = await itx.client.database.fetch_nickname(creator)
     await itx.edit_original_response(
         content=(f"Adding **{nickname}** " f"to list of creators for map code **{map_code}**.")
@@ -143,142 +143,63 @@ class MapSubmission:
             new_map_id,
         )
 
-    async def insert_maps(self, itx: discord.Interaction[core.Genji], mod: bool) -> None:
-        await itx.client.database.set(
-            """
-            INSERT INTO
-            maps (map_name, map_type, map_code, "desc", official, checkpoints)
-            VALUES ($1, $2, $3, $4, $5, $6);
-            """,
+    async def insert_all(self, itx: discord.Interaction[core.Genji], mod: bool) -> None:
+        """Insert the map and all of its related rows atomically in a single round trip."""
+        await itx.client.database.execute_named(
+            "map_submission_insert",
+            self.map_code,
             self.map_name,
             self.map_types,
-            self.map_code,
             self.description,
             mod,
             self.checkpoint_count,
-        )
-
-    async def insert_mechanics(self, itx: discord.Interaction[core.Genji]) -> None:
-        mechanics = [(self.map_code, x) for x in self.mechanics]
-        await itx.client.database.set_many(
-            """
-            INSERT INTO map_mechanics (map_code, mechanic)
-            VALUES ($1, $2);
-            """,
-            mechanics,
-        )
-
-    async def insert_restrictions(self, itx: discord.Interaction[core.Genji]) -> None:
-        restrictions = [(self.map_code, x) for x in self.restrictions]
-        await itx.client.database.set_many(
-            """
-            INSERT INTO map_restrictions (map_code, restriction)
-            VALUES ($1, $2);
-            """,
-            restrictions,
-        )
-
-    async def insert_map_creators(self, itx: discord.Interaction[core.Genji]) -> None:
-        await itx.client.database.set(
-            """
-            INSERT INTO map_creators (map_code, user_id)
-            VALUES ($1, $2);
-            """,
-            self.map_code,
-            self.creator.id,
-        )
-
-    async def insert_map_ratings(self, itx: discord.Interaction[core.Genji]) -> None:
-        await itx.client.database.set(
-            """
-            INSERT INTO map_ratings (map_code, user_id, difficulty)
-            VALUES ($1, $2, $3);
-            """,
-            self.map_code,
+            self.mechanics or [],
+            self.restrictions or [],
             self.creator.id,
             ranks.ALL_DIFFICULTY_RANGES_MIDPOINT[self.difficulty],
+            [guide for guide in self.guides or [] if guide],
+            self.gold,
+            self.silver,
+            self.bronze,
+            bool(self.medals),
         )
-
-    async def insert_guide(self, itx: discord.Interaction[core.Genji]) -> None:
-        _guides = [(self.map_code, guide) for guide in self.guides if guide]
-        if _guides:
-            await itx.client.database.set_many(
-                """INSERT INTO guides (map_code, url) VALUES ($1, $2);""",
-                _guides,
-            )
-
-    async def insert_medals(self, itx: discord.Interaction[core.Genji]) -> None:
-        if self.medals:
-            await itx.client.database.set(
-                """
-                INSERT INTO map_medals (gold, silver, bronze, map_code)
-                VALUES ($1, $2, $3, $4);
-                """,
-                self.gold,
-                self.silver,
-                self.bronze,
-                self.map_code,
-            )
-
-    async def insert_timestamp(self, itx: discord.Interaction[core.Genji], mod: bool) -> None:
-        if not mod:
-            await itx.client.database.set(
-                """
-                INSERT INTO map_submission_dates (user_id, map_code)
-                VALUES ($1, $2);
-                """,
-                self.creator.id,
-                self.map_code,
-            )
-
-    async def insert_all(self, itx: discord.Interaction[core.Genji], mod: bool) -> None:
-        await self.insert_maps(itx, mod)
-        await self.insert_mechanics(itx)
-        await self.insert_restrictions(itx)
-        await self.insert_map_creators(itx)
-        await self.insert_map_ratings(itx)
-        await self.insert_guide(itx)
-        await self.insert_medals(itx)
-        await self.insert_timestamp(itx, mod)
+        itx.client.database.user_search.add_creator(self.creator.id)
 
 
 async def get_map_info(client: core.Genji, message_id: int | None = None) -> list[database.DotRecord | None]:
     """Get map info."""
-    return [
-        x
-        async for x in client.database.get(
-            """
-            SELECT map_name,
-                   map_type,
-                   m.map_code,
-                   "desc",
-                   official,
-                   archived,
-                   AVG(value) as value,
-                   array_agg(DISTINCT url)              AS guide,
-                   array_agg(DISTINCT mech.mechanic)    AS mechanics,
-                   array_agg(DISTINCT rest.restriction) AS restrictions,
-                   checkpoints,
-                   array_agg(DISTINCT mc.user_id)       AS creator_ids,
-                   gold,
-                   silver,
-                   bronze,
-                   p.message_id
-            FROM playtest p
-                     LEFT JOIN maps m on m.map_code = p.map_code
-                     LEFT JOIN map_mechanics mech on mech.map_code = m.map_code
-                     LEFT JOIN map_restrictions rest on rest.map_code = m.map_code
-                     LEFT JOIN map_creators mc on m.map_code = mc.map_code
-                     LEFT JOIN users u on mc.user_id = u.user_id
-                     LEFT JOIN guides g on m.map_code = g.map_code
-                     LEFT JOIN map_medals mm on m.map_code = mm.map_code
-            WHERE is_author = TRUE AND ($1::bigint IS NULL OR $1::bigint = p.message_id)
-            GROUP BY checkpoints, map_name,
-                     m.map_code, "desc", official, map_type, gold, silver, bronze, archived, p.message_id
-            """,
-            message_id,
-        )
-    ]
+    return await client.database.fetch(
+        """
+        SELECT map_name,
+               map_type,
+               m.map_code,
+               "desc",
+               official,
+               archived,
+               AVG(value) as value,
+               array_agg(DISTINCT url)              AS guide,
+               array_agg(DISTINCT mech.mechanic)    AS mechanics,
+               array_agg(DISTINCT rest.restriction) AS restrictions,
+               checkpoints,
+               array_agg(DISTINCT mc.user_id)       AS creator_ids,
+               gold,
+               silver,
+               bronze,
+               p.message_id
+        FROM playtest p
+                 LEFT JOIN maps m on m.map_code = p.map_code
+                 LEFT JOIN map_mechanics mech on mech.map_code = m.map_code
+                 LEFT JOIN map_restrictions rest on rest.map_code = m.map_code
+                 LEFT JOIN map_creators mc on m.map_code = mc.map_code
+                 LEFT JOIN users u on mc.user_id = u.user_id
+                 LEFT JOIN guides g on m.map_code = g.map_code
+                 LEFT JOIN map_medals mm on m.map_code = mm.map_code
+        WHERE is_author = TRUE AND ($1::bigint IS NULL OR $1::bigint = p.message_id)
+        GROUP BY checkpoints, map_name,
+                 m.map_code, "desc", official, map_type, gold, silver, bronze, archived, p.message_id
+        """,
+        message_id,
+    )
 
 
 _MAPS_BASE_URL = "https://bkan0n.com/assets/images/map_banners/"
@@ -133,6 +133,33 @@ class Map(msgspec.Struct, kw_only=True):
     def build_embed(self) -> None: ...
 
 
+class MapSearchResult(msgspec.Struct, kw_only=True):
+    """A row of the `map_search` named query."""
+
+    map_name: str
+    map_type: str | None = None
+    map_code: str
+    desc: str | None = None
+    official: bool | None = None
+    archived: bool | None = None
+    guide: list[str | None] | None = None
+    mechanics: str | None = None
+    restrictions: str | None = None
+    checkpoints: int | None = None
+    creators: str | None = None
+    difficulty: float | None = None
+    quality: float | None = None
+    creator_ids: list[int | None] | None = None
+    gold: float | None = None
+    silver: float | None = None
+    bronze: float | None = None
+    thread_id: int | None = None
+    count: int | None = None
+    required_votes: int | None = None
+    completed: bool | None = None
+    medal_type: str | None = None
+
+
 class Record(msgspec.Struct, kw_only=True):
     map_code: str | None = None
     user_id: int | None = None
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import logging
+import typing
+
+import asyncpg
+import discord
+
+from .search import VOCABULARIES, Vocabulary
+
+if typing.TYPE_CHECKING:
+    from database import Database
+
+log = logging.getLogger(__name__)
+
+
+class OptionSet(typing.NamedTuple):
+    version: int
+    options: tuple[discord.SelectOption, ...]
+
+
+class SelectOptionSets:
+    """Prebuilt select menu options for the map type, name, mechanic and restriction vocabularies.
+
+    Sets are preloaded on startup and rebuilt in the background when their `all_map_*` table
+    changes, so building a select menu doesn't query the database. Every rebuild bumps the
+    set's version. The stored options are never handed out, callers get copies they may edit.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self.database = database
+        self._sets: dict[Vocabulary, OptionSet] = {}
+        self._versions: dict[Vocabulary, int] = collections.defaultdict(int)
+        self._locks: dict[Vocabulary, asyncio.Lock] = collections.defaultdict(asyncio.Lock)
+        self._refresh_tasks: set[asyncio.Task[OptionSet]] = set()
+        database.add_invalidation_hook(self._on_tables_changed)
+
+    async def preload(self) -> None:
+        """Build every option set, leaving any that fail to be built on first use."""
+        results = await asyncio.gather(
+            *(self.get_set(vocabulary) for vocabulary in VOCABULARIES), return_exceptions=True
+        )
+        for vocabulary, result in zip(VOCABULARIES, results):
+            if isinstance(result, (OSError, asyncpg.PostgresError)):
+                log.warning("Couldn't preload %s select options: %r", vocabulary, result)
+            elif isinstance(result, BaseException):
+                raise result
+
+    async def get(self, vocabulary: Vocabulary) -> list[discord.SelectOption]:
+        """Get fresh copies of the options for a vocabulary."""
+        option_set = await self.get_set(vocabulary)
+        return [option.copy() for option in option_set.options]
+
+    async def get_set(self, vocabulary: Vocabulary) -> OptionSet:
+        """Get the current option set for a vocabulary, building it if needed."""
+        option_set = self._sets.get(vocabulary)
+        if option_set is not None:
+            return option_set
+        async with self._locks[vocabulary]:
+            option_set = self._sets.get(vocabulary)
+            if option_set is None:
+                option_set = await self._build(vocabulary)
+        return option_set
+
+    async def _build(self, vocabulary: Vocabulary) -> OptionSet:
+        _, query_name = VOCABULARIES[vocabulary]
+        version = self._versions[vocabulary]
+        rows = await self.database.fetch_named(query_name)
+        option_set = OptionSet(
+            version,
+            tuple(discord.SelectOption(label=row["name"], value=row["name"]) for row in rows),
+        )
+        # Built from data that changed mid-build, so leave it for the next use to rebuild.
+        if version == self._versions[vocabulary]:
+            self._sets[vocabulary] = option_set
+        log.debug("Built %s select options v%d with %d options.", vocabulary, version, len(option_set.options))
+        return option_set
+
+    def _schedule_refresh(self, vocabulary: Vocabulary) -> None:
+        task = asyncio.create_task(self.get_set(vocabulary))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, task: asyncio.Task[OptionSet]) -> None:
+        self._refresh_tasks.discard(task)
+        if not task.cancelled() and (exc := task.exception()) is not None:
+            log.warning("Background select option refresh failed: %r", exc)
+
+    def _on_tables_changed(self, tables: frozenset[str] | None, _user_ids: frozenset[int] | None) -> None:
+        for vocabulary, (table, _) in VOCABULARIES.items():
+            if tables is None or table in tables:
+                self._versions[vocabulary] += 1
+                # Only sets that were in use are rebuilt right away, the rest wait for their first use.
+                if self._sets.pop(vocabulary, None) is not None:
+                    self._schedule_refresh(vocabulary)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import typing
+
+import numpy as np
+
+from .models import RankDetail
+from .ranks import RANK_THRESHOLDS, TOP_DIFFICULTIES_RANGES
+
+if typing.TYPE_CHECKING:
+    import database
+
+RANKED_DIFFICULTIES = tuple(RANK_THRESHOLDS)
+_THRESHOLDS = np.array(tuple(RANK_THRESHOLDS.values()), dtype=np.int64)
+
+# Upper bounds of every ranked difficulty but the last. Beginner maps count as Easy.
+_BUCKET_EDGES = np.array([TOP_DIFFICULTIES_RANGES[name][1] for name in RANKED_DIFFICULTIES[:-1]], dtype=np.float64)
+
+NO_MEDAL, BRONZE, SILVER, GOLD = range(4)
+_LEGACY_MEDALS = {"Bronze": BRONZE, "Silver": SILVER, "Gold": GOLD}
+
+
+class RecordSnapshot(typing.NamedTuple):
+    """Every user's latest record on every official map, one array per column.
+
+    Maps without difficulty ratings and records without a medal time use NaN.
+    """
+
+    user_id: np.ndarray
+    difficulty: np.ndarray
+    record: np.ndarray
+    gold: np.ndarray
+    silver: np.ndarray
+    bronze: np.ndarray
+    # Verified with a video, so the record can earn a medal.
+    medal_eligible: np.ndarray
+    legacy_medal: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: typing.Sequence[typing.Sequence[typing.Any]]) -> RecordSnapshot:
+        """Build a snapshot from `rank_engine_snapshot` rows."""
+        columns = list(zip(*rows)) or [()] * 8
+        user_id, difficulty, record, gold, silver, bronze, medal_eligible, legacy_medal = columns
+        return cls(
+            np.array(user_id, dtype=np.int64),
+            _floats(difficulty),
+            _floats(record),
+            _floats(gold),
+            _floats(silver),
+            _floats(bronze),
+            np.array(medal_eligible, dtype=bool),
+            np.array([_LEGACY_MEDALS.get(medal, NO_MEDAL) for medal in legacy_medal], dtype=np.int8),
+        )
+
+    @classmethod
+    async def load(cls, db: database.Database, *, include_archived: bool = True) -> RecordSnapshot:
+        """Load a snapshot of the whole `records` table."""
+        rows = await db.fetch_named("rank_engine_snapshot", include_archived)
+        return await asyncio.to_thread(cls.from_rows, rows)
+
+    def __len__(self) -> int:
+        """Return the amount of records."""
+        return len(self.user_id)
+
+
+def _floats(values: typing.Sequence[typing.Any]) -> np.ndarray:
+    return np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+
+
+def difficulty_buckets(difficulty: np.ndarray) -> np.ndarray:
+    """Get the index into `RANKED_DIFFICULTIES` for each difficulty, or -1 for unrated maps."""
+    buckets = np.searchsorted(_BUCKET_EDGES, difficulty, side="right")
+    return np.where(np.isnan(difficulty), -1, buckets)
+
+
+def medal_flags(snapshot: RecordSnapshot) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Get which records earned gold, silver and bronze.
+
+    A record earns a medal with a time inside the medal's range or with the matching legacy
+    medal. NaN medal times never match, like NULL in SQL.
+    """
+    record, eligible, legacy = snapshot.record, snapshot.medal_eligible, snapshot.legacy_medal
+    with np.errstate(invalid="ignore"):
+        gold = eligible & ((record <= snapshot.gold) | (legacy == GOLD))
+        silver = eligible & (((record <= snapshot.silver) & (record > snapshot.gold)) | (legacy == SILVER))
+        bronze = eligible & (((record <= snapshot.bronze) & (record > snapshot.silver)) | (legacy == BRONZE))
+    return gold, silver, bronze
+
+
+class RankTable(typing.NamedTuple):
+    """Completion and medal counts per user and ranked difficulty.
+
+    Every count array has a row per entry in `user_ids` and a column per `RANKED_DIFFICULTIES`.
+    """
+
+    user_ids: np.ndarray
+    completions: np.ndarray
+    gold: np.ndarray
+    silver: np.ndarray
+    bronze: np.ndarray
+
+    @classmethod
+    def compute(cls, snapshot: RecordSnapshot) -> RankTable:
+        """Count every user's completions and medals in one pass over the snapshot."""
+        buckets = difficulty_buckets(snapshot.difficulty)
+        ranked = buckets >= 0
+        user_ids, users = np.unique(snapshot.user_id, return_inverse=True)
+        cells = users[ranked] * len(RANKED_DIFFICULTIES) + buckets[ranked]
+        shape = (len(user_ids), len(RANKED_DIFFICULTIES))
+
+        def _count(mask: np.ndarray | None = None) -> np.ndarray:
+            selected = cells if mask is None else cells[mask[ranked]]
+            return np.bincount(selected, minlength=shape[0] * shape[1]).reshape(shape)
+
+        gold, silver, bronze = medal_flags(snapshot)
+        return cls(user_ids, _count(), _count(gold), _count(silver), _count(bronze))
+
+    @property
+    def rank_met(self) -> np.ndarray:
+        return self.completions >= _THRESHOLDS
+
+    @property
+    def gold_rank_met(self) -> np.ndarray:
+        return self.gold >= _THRESHOLDS
+
+    @property
+    def silver_rank_met(self) -> np.ndarray:
+        return self.silver >= _THRESHOLDS
+
+    @property
+    def bronze_rank_met(self) -> np.ndarray:
+        return self.bronze >= _THRESHOLDS
+
+    def details(self, user_ids: typing.Iterable[int]) -> dict[int, list[RankDetail]]:
+        """Get `RankDetail` rows like `utils.fetch_users_rank_data`, with zeroes for users without records."""
+        rows = dict(zip(self.user_ids.tolist(), range(len(self.user_ids))))
+        columns = (
+            self.completions,
+            self.gold,
+            self.silver,
+            self.bronze,
+            self.rank_met,
+            self.gold_rank_met,
+            self.silver_rank_met,
+            self.bronze_rank_met,
+        )
+        empty = [[0] * len(RANKED_DIFFICULTIES)] * 4 + [[False] * len(RANKED_DIFFICULTIES)] * 4
+        result = {}
+        for user_id in user_ids:
+            row = rows.get(user_id)
+            values = empty if row is None else [column[row].tolist() for column in columns]
+            result[user_id] = [
+                RankDetail(difficulty, *(value[i] for value in values))
+                for i, difficulty in enumerate(RANKED_DIFFICULTIES)
+            ]
+        return result
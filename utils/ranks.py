@@ -22,6 +22,16 @@ DIFFICULTIES_EXT = [
 
 DIFFICULTIES = list(filter(lambda y: not ("-" in y or "+" in y), DIFFICULTIES_EXT))
 
+# Difficulties that count towards skill ranks, in rank order, and how many completions each rank needs.
+RANK_THRESHOLDS = {
+    "Easy": 10,
+    "Medium": 10,
+    "Hard": 10,
+    "Very Hard": 10,
+    "Extreme": 7,
+    "Hell": 3,
+}
+
 
 def generate_difficulty_ranges(
     top_level: bool = False,
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Spread calls out to at most `rate` per second, allowing bursts of up to `capacity`.
+
+    Waiters are served in the order they arrived.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        if rate <= 0 or capacity < 1:
+            raise ValueError("Rate must be positive and capacity at least 1.")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def tokens(self) -> float:
+        """Return the amount of calls that can be made right now."""
+        self._refill()
+        return self._tokens
+
+    async def acquire(self) -> None:
+        """Wait until a call may be made and take its token."""
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import types
+import typing
+
+if typing.TYPE_CHECKING:
+    import discord
+
+
+class RoleIndex:
+    """Guild roles by name, so lookups don't scan `guild.roles`.
+
+    Each guild's index is built on first use and rebuilt by the role create, update and delete
+    events. Like `discord.utils.get`, the lowest role wins when several share a name.
+    """
+
+    def __init__(self) -> None:
+        self._guilds: dict[int, types.MappingProxyType[str, discord.Role]] = {}
+
+    def for_guild(self, guild: discord.Guild) -> typing.Mapping[str, discord.Role]:
+        """Get every role in a guild by name."""
+        roles = self._guilds.get(guild.id)
+        if roles is None:
+            roles = self.rebuild(guild)
+        return roles
+
+    def get(self, guild: discord.Guild, name: str) -> discord.Role | None:
+        """Get a guild role by name."""
+        return self.for_guild(guild).get(name)
+
+    def rebuild(self, guild: discord.Guild) -> typing.Mapping[str, discord.Role]:
+        """Index a guild's roles again."""
+        roles: dict[str, discord.Role] = {}
+        for role in guild.roles:
+            roles.setdefault(role.name, role)
+        self._guilds[guild.id] = proxy = types.MappingProxyType(roles)
+        return proxy
+
+    def forget(self, guild_id: int) -> None:
+        """Drop a guild's index."""
+        self._guilds.pop(guild_id, None)
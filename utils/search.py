@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import heapq
+import itertools
+import logging
+import re
+import typing
+
+if typing.TYPE_CHECKING:
+    from database import Database
+
+log = logging.getLogger(__name__)
+
+_K = typing.TypeVar("_K", bound=typing.Hashable)
+
+Vocabulary = typing.Literal["map_type", "map_name", "mechanics", "restrictions"]
+
+# Vocabulary -> (table, named query listing every name in display order)
+VOCABULARIES: dict[Vocabulary, tuple[str, str]] = {
+    "map_type": ("all_map_types", "map_type_options"),
+    "map_name": ("all_map_names", "map_name_options"),
+    "mechanics": ("all_map_mechanics", "mechanic_options"),
+    "restrictions": ("all_map_restrictions", "restriction_options"),
+}
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: str) -> frozenset[str]:
+    """Split text into trigrams the same way `pg_trgm` does.
+
+    Every word is lowercased and padded with two spaces in front and one behind.
+    """
+    grams = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class KeyedTrigramIndex(typing.Generic[_K]):
+    """Rank texts stored under keys by trigram similarity to a query.
+
+    Texts that start with the query rank first, then texts by `pg_trgm` style similarity
+    (shared trigrams over all trigrams), then in the order their keys were added. Texts may
+    repeat, and can be added, replaced and removed one at a time, e.g. for nicknames.
+    """
+
+    def __init__(self, items: typing.Iterable[tuple[_K, str]] = ()) -> None:
+        self._texts: dict[_K, str] = {}
+        self._grams: dict[_K, frozenset[str]] = {}
+        self._order: dict[_K, int] = {}
+        self._postings: dict[str, set[_K]] = collections.defaultdict(set)
+        self._counter = itertools.count()
+        for key, text in items:
+            self.put(key, text)
+
+    def __len__(self) -> int:
+        """Return the amount of indexed texts."""
+        return len(self._texts)
+
+    def __contains__(self, key: object) -> bool:
+        """Check if a key is indexed."""
+        return key in self._texts
+
+    def get(self, key: _K) -> str | None:
+        """Get the text stored under a key."""
+        return self._texts.get(key)
+
+    def put(self, key: _K, text: str) -> None:
+        """Add or replace the text stored under a key."""
+        self.discard(key)
+        grams = trigrams(text)
+        self._texts[key] = text
+        self._grams[key] = grams
+        self._order[key] = next(self._counter)
+        for gram in grams:
+            self._postings[gram].add(key)
+
+    def discard(self, key: _K) -> None:
+        """Remove a key if it is indexed."""
+        if self._texts.pop(key, None) is None:
+            return
+        del self._order[key]
+        for gram in self._grams.pop(key):
+            keys = self._postings[gram]
+            keys.discard(key)
+            if not keys:
+                del self._postings[gram]
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        keys: typing.Collection[_K] | None = None,
+    ) -> list[tuple[_K, str]]:
+        """Get the `limit` best matching `(key, text)` pairs, optionally only among `keys`."""
+        query = query.strip()
+        grams = trigrams(query)
+        shared: collections.Counter[_K] = collections.Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+
+        lowered = query.lower()
+        scored = []
+        for key, common in shared.items():
+            if keys is not None and key not in keys:
+                continue
+            similarity = common / (len(grams) + len(self._grams[key]) - common)
+            scored.append((not self._texts[key].lower().startswith(lowered), -similarity, self._order[key], key))
+        results = [(key, self._texts[key]) for *_, key in heapq.nsmallest(limit, scored)]
+        if len(results) < limit:
+            # Postgres orders unrelated rows last instead of leaving them out.
+            for key in self._texts if keys is None else keys:
+                if key not in shared and key in self._texts:
+                    results.append((key, self._texts[key]))
+                    if len(results) == limit:
+                        break
+        return results
+
+
+class TrigramIndex:
+    """Rank a small, fixed set of names by trigram similarity to a query.
+
+    A `KeyedTrigramIndex` keyed by the names themselves, so ties keep the names' original order.
+    """
+
+    def __init__(self, names: typing.Iterable[str]) -> None:
+        self.names = list(dict.fromkeys(names))
+        self._index = KeyedTrigramIndex((name, name) for name in self.names)
+
+    def __len__(self) -> int:
+        """Return the amount of indexed names."""
+        return len(self.names)
+
+    def search(self, query: str, limit: int = 10) -> list[str]:
+        """Get the `limit` names most similar to `query`."""
+        return [name for name, _ in self._index.search(query, limit)]
+
+    def closest(self, query: str) -> str | None:
+        """Get the name most similar to `query`."""
+        results = self.search(query, 1)
+        return results[0] if results else None
+
+
+class VocabularyIndexes:
+    """Trigram indexes for the map type, name, mechanic and restriction vocabularies.
+
+    Each index is built from the database on first use and rebuilt lazily after
+    its `all_map_*` table changes.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self.database = database
+        self._indexes: dict[Vocabulary, TrigramIndex] = {}
+        self._locks: dict[Vocabulary, asyncio.Lock] = collections.defaultdict(asyncio.Lock)
+        # Bumped on invalidation, so an index built from data that changed mid-build isn't kept.
+        self._generation = 0
+        database.add_invalidation_hook(self._on_tables_changed)
+
+    async def get(self, vocabulary: Vocabulary) -> TrigramIndex:
+        """Get the index for a vocabulary, building it if needed."""
+        index = self._indexes.get(vocabulary)
+        if index is not None:
+            return index
+        async with self._locks[vocabulary]:
+            index = self._indexes.get(vocabulary)
+            if index is None:
+                _, query_name = VOCABULARIES[vocabulary]
+                generation = self._generation
+                rows = await self.database.fetch_named(query_name)
+                index = TrigramIndex(row["name"] for row in rows)
+                if generation == self._generation:
+                    self._indexes[vocabulary] = index
+                log.debug("Built %s trigram index with %d names.", vocabulary, len(index))
+        return index
+
+    async def search(self, vocabulary: Vocabulary, query: str, limit: int = 10) -> list[str]:
+        """Get the names in a vocabulary most similar to `query`."""
+        return (await self.get(vocabulary)).search(query, limit)
+
+    async def closest(self, vocabulary: Vocabulary, query: str) -> str | None:
+        """Get the name in a vocabulary most similar to `query`."""
+        return (await self.get(vocabulary)).closest(query)
+
+    def _on_tables_changed(self, tables: frozenset[str] | None, _user_ids: frozenset[int] | None) -> None:
+        for vocabulary, (table, _) in VOCABULARIES.items():
+            if tables is None or table in tables:
+                self._generation += 1
+                self._indexes.pop(vocabulary, None)
+
+
+class CommandCatalog:
+    """Every command name that has been logged to the `analytics` table.
+
+    Loaded once with an index skip scan instead of a `DISTINCT` over the whole table, and
+    extended with new names whenever the analytics buffer is flushed.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self.database = database
+        self._names: KeyedTrigramIndex[str] | None = None
+        self._lock = asyncio.Lock()
+
+    async def _index(self) -> KeyedTrigramIndex[str]:
+        if self._names is None:
+            async with self._lock:
+                if self._names is None:
+                    rows = await self.database.fetch_named("analytics_event_names")
+                    self._names = KeyedTrigramIndex((row["event"], row["event"]) for row in rows)
+                    log.debug("Loaded %d command names.", len(self._names))
+        return self._names
+
+    def add(self, names: typing.Iterable[str]) -> None:
+        """Add newly logged command names, if the catalog has been loaded."""
+        if self._names is None:
+            return
+        for name in names:
+            if name not in self._names:
+                self._names.put(name, name)
+
+    async def search(self, query: str, limit: int = 5) -> list[str]:
+        """Get the command names most similar to `query`."""
+        return [name for name, _ in (await self._index()).search(query, limit)]
+
+    async def contains(self, name: str) -> bool:
+        """Check if a command name has ever been logged."""
+        return name in await self._index()
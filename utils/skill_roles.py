@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import logging
+import time
+import typing
+
+import discord
+
+from .rank_engine import RankTable, RecordSnapshot
+from .utils import determine_skill_rank_roles_to_give, fetch_users_rank_data
+
+if typing.TYPE_CHECKING:
+    import core
+
+    from .models import RankDetail
+
+log = logging.getLogger(__name__)
+
+
+class SkillRoleSync:
+    """Bring every member's skill roles in line with their ranks.
+
+    Every member's ranks are computed up front by `utils.rank_engine`, from one snapshot of the
+    records table. Members are then processed in id order, in batches: their ranks are diffed
+    against their roles, and members whose roles differ are edited through the bot's role edit
+    rate limit. A run can take hours, so the ranks of those members are fetched again just
+    before their batch is edited. The last finished batch is saved, so a run that was cancelled
+    or crashed resumes where it stopped. Dry runs only count what would change.
+
+    Progress is kept in `skill_role_sync`, created by
+    `database/migrations/004_skill_role_sync.sql`.
+    """
+
+    def __init__(
+        self,
+        bot: core.Genji,
+        guild: discord.Guild,
+        *,
+        dry_run: bool = False,
+        batch_size: int = 500,
+        concurrency: int = 4,
+    ) -> None:
+        self.bot = bot
+        self.guild = guild
+        self.dry_run = dry_run
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.total = 0
+        self.skipped = 0
+        self.checked = 0
+        self.changed = 0
+        self.failed = 0
+        self.added: collections.Counter[str] = collections.Counter()
+        self.removed: collections.Counter[str] = collections.Counter()
+        self.completed = False
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    async def run(self, *, resume: bool = True) -> None:
+        """Reconcile every member, continuing from the last saved batch if `resume` is set."""
+        self.started_at = time.monotonic()
+        db = self.bot.database
+        cursor = 0
+        if resume:
+            cursor = (
+                await db.fetchval("SELECT last_user_id FROM skill_role_sync WHERE guild_id = $1", self.guild.id) or 0
+            )
+
+        snapshot = await RecordSnapshot.load(db)
+        ranks = await asyncio.to_thread(RankTable.compute, snapshot)
+
+        members = sorted((member for member in self.guild.members if not member.bot), key=lambda member: member.id)
+        self.total = len(members)
+        pending = [member for member in members if member.id > cursor]
+        self.skipped = self.total - len(pending)
+
+        try:
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start : start + self.batch_size]
+                await self._reconcile_batch(batch, ranks)
+                if not self.dry_run:
+                    await db.execute(
+                        """
+                        INSERT INTO skill_role_sync (guild_id, last_user_id) VALUES ($1, $2)
+                        ON CONFLICT (guild_id) DO UPDATE SET last_user_id = excluded.last_user_id, updated_at = now()
+                        """,
+                        self.guild.id,
+                        batch[-1].id,
+                    )
+
+            if not self.dry_run:
+                await db.execute("DELETE FROM skill_role_sync WHERE guild_id = $1", self.guild.id)
+            self.completed = True
+        finally:
+            self.finished_at = time.monotonic()
+            log.info("Skill role sync stopped: %s", self.progress())
+
+    async def _reconcile_batch(self, batch: list[discord.Member], ranks: RankTable) -> None:
+        data = ranks.details(member.id for member in batch)
+        roles = self.bot.role_index.for_guild(self.guild)
+        if not self.dry_run:
+            # The snapshot may be hours old by now, so don't edit anyone based on it alone.
+            stale = [member.id for member in batch if any(self._role_changes(member, data[member.id], roles))]
+            if stale:
+                data.update(await fetch_users_rank_data(self.bot.database, stale, True))
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _reconcile(member: discord.Member) -> None:
+            async with semaphore:
+                try:
+                    await self._reconcile_member(member, data[member.id], roles)
+                except discord.HTTPException as e:
+                    self.failed += 1
+                    log.warning("Couldn't sync skill roles for %s: %r", member.id, e)
+                self.checked += 1
+
+        await asyncio.gather(*(_reconcile(member) for member in batch))
+
+    async def _reconcile_member(
+        self,
+        member: discord.Member,
+        data: list[RankDetail],
+        roles: typing.Mapping[str, discord.Role],
+    ) -> None:
+        added, removed = self._role_changes(member, data, roles)
+        if not added and not removed:
+            return
+
+        self.changed += 1
+        self.added.update(role.name for role in added)
+        self.removed.update(role.name for role in removed)
+        if self.dry_run:
+            return
+
+        await self.bot.role_edits.acquire()
+        # Roles may have changed while waiting for the rate limit.
+        await member.edit(roles=list((set(member.roles) | added) - removed), reason="Skill role sync")
+
+    @staticmethod
+    def _role_changes(
+        member: discord.Member,
+        data: list[RankDetail],
+        roles: typing.Mapping[str, discord.Role],
+    ) -> tuple[set[discord.Role], set[discord.Role]]:
+        """Get the skill roles a member is missing and the ones they shouldn't have."""
+        grant, remove = determine_skill_rank_roles_to_give(data, roles)
+        # Roles missing from the guild come back as None.
+        grant = {role for role in grant if role is not None}
+        remove = {role for role in remove if role is not None} - grant
+        current = set(member.roles)
+        return grant - current, remove & current
+
+    def progress(self) -> str:
+        """Describe how far the run has come and what it changed."""
+        if self.started_at is None:
+            return "Not started."
+        elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        state = "running" if self.finished_at is None else ("finished" if self.completed else "stopped")
+        verb = "would change" if self.dry_run else "changed"
+        lines = [
+            f"{'Dry run' if self.dry_run else 'Sync'} {state} ({elapsed:.0f}s)",
+            f"checked {self.checked}/{self.total - self.skipped} members"
+            + (f" (resumed, {self.skipped} already done)" if self.skipped else ""),
+            f"{verb} {self.changed}, failed {self.failed}",
+        ]
+        if self.added:
+            lines.append("added: " + ", ".join(f"{name} x{count}" for name, count in self.added.most_common(10)))
+        if self.removed:
+            lines.append("removed: " + ", ".join(f"{name} x{count}" for name, count in self.removed.most_common(10)))
+        return "\n".join(lines)
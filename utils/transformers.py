@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING
 from discord import app_commands
 
 from . import constants, errors, utils
+from .autocomplete import dispatch_autocomplete
 from .records import CODE_VERIFICATION
 
 if TYPE_CHECKING:
@@ -31,62 +32,58 @@ async def transform_user(client: core.Genji, value: str) -> utils.FakeUser | dis
 
 class MapNameTransformer(app_commands.Transformer):
     async def transform(self, itx: discord.Interaction[core.Genji], value: str) -> str:
-        query = "SELECT name FROM all_map_names ORDER BY similarity(name, $1::text) DESC LIMIT 1;"
-        return await itx.client.database.fetchval(query, value)
+        return await itx.client.vocabularies.closest("map_name", value)
 
+    @dispatch_autocomplete()
     async def autocomplete(
         self,
         itx: discord.Interaction[core.Genji],
         current: str,
     ) -> list[app_commands.Choice[str]]:
-        query = "SELECT name FROM all_map_names ORDER BY similarity(name, $1::text) DESC LIMIT 10;"
-        names = await itx.client.database.fetch(query, current)
-        return [app_commands.Choice(name=x, value=x) for (x,) in names]
+        names = await itx.client.vocabularies.search("map_name", current)
+        return [app_commands.Choice(name=x, value=x) for x in names]
 
 
 class MapTypesTransformer(app_commands.Transformer):
     async def transform(self, itx: discord.Interaction[core.Genji], value: str) -> str:
-        query = "SELECT name FROM all_map_types ORDER BY similarity(name, $1::text) DESC LIMIT 1;"
-        return await itx.client.database.fetchval(query, value)
+        return await itx.client.vocabularies.closest("map_type", value)
 
+    @dispatch_autocomplete()
     async def autocomplete(
         self,
         itx: discord.Interaction[core.Genji],
         current: str,
     ) -> list[app_commands.Choice[str]]:
-        query = "SELECT name FROM all_map_types ORDER BY similarity(name, $1::text) DESC LIMIT 10;"
-        types = await itx.client.database.fetch(query, current)
-        return [app_commands.Choice(name=x, value=x) for (x,) in types]
+        types = await itx.client.vocabularies.search("map_type", current)
+        return [app_commands.Choice(name=x, value=x) for x in types]
 
 
 class MapMechanicsTransformer(app_commands.Transformer):
     async def transform(self, itx: discord.Interaction[core.Genji], value: str) -> str:
-        query = "SELECT name FROM all_map_mechanics ORDER BY similarity(name, $1::text) DESC LIMIT 1;"
-        return await itx.client.database.fetchval(query, value)
+        return await itx.client.vocabularies.closest("mechanics", value)
 
+    @dispatch_autocomplete()
     async def autocomplete(
         self,
         itx: discord.Interaction[core.Genji],
         current: str,
     ) -> list[app_commands.Choice[str]]:
-        query = "SELECT name FROM all_map_mechanics ORDER BY similarity(name, $1::text) DESC LIMIT 10;"
-        mechanics = await itx.client.database.fetch(query, current)
-        return [app_commands.Choice(name=x, value=x) for (x,) in mechanics]
+        mechanics = await itx.client.vocabularies.search("mechanics", current)
+        return [app_commands.Choice(name=x, value=x) for x in mechanics]
 
 
 class MapRestrictionsTransformer(app_commands.Transformer):
     async def transform(self, itx: discord.Interaction[core.Genji], value: str) -> str:
-        query = "SELECT name FROM all_map_restrictions ORDER BY similarity(name, $1::text) DESC LIMIT 1;"
-        return await itx.client.database.fetchval(query, value)
+        return await itx.client.vocabularies.closest("restrictions", value)
 
+    @dispatch_autocomplete()
     async def autocomplete(
         self,
         itx: discord.Interaction[core.Genji],
         current: str,
     ) -> list[app_commands.Choice[str]]:
-        query = "SELECT name FROM all_map_restrictions ORDER BY similarity(name, $1::text) DESC LIMIT 10;"
-        restrictions = await itx.client.database.fetch(query, current)
-        return [app_commands.Choice(name=x, value=x) for (x,) in restrictions]
+        restrictions = await itx.client.vocabularies.search("restrictions", current)
+        return [app_commands.Choice(name=x, value=x) for x in restrictions]
 
 
 class _MapCodeBaseTransformer(app_commands.Transformer):
@@ -106,10 +103,10 @@ class MapCodeSubmitTransformer(_MapCodeBaseTransformer):
 
 
 class _MapCodeAutocompleteBaseTransformer(_MapCodeBaseTransformer):
+    @dispatch_autocomplete()
     async def autocomplete(self, itx: discord.Interaction[core.Genji], current: str) -> list[app_commands.Choice[str]]:
-        query = "SELECT map_code FROM maps WHERE archived = FALSE ORDER BY similarity(map_code, $1) DESC LIMIT 5;"
-        results = await itx.client.database.fetch(query, current)
-        return [app_commands.Choice(name=a, value=a) for (a,) in results]
+        results = await itx.client.database.map_codes.search(current)
+        return [app_commands.Choice(name=a, value=a) for a in results]
 
 
 class MapCodeTransformer(_MapCodeAutocompleteBaseTransformer):
@@ -121,9 +118,7 @@ class MapCodeTransformer(_MapCodeAutocompleteBaseTransformer):
         value = self._clean_code(value)
         if not re.match(CODE_VERIFICATION, value):
             raise errors.IncorrectCodeFormatError
-        query = "SELECT map_code FROM maps WHERE archived = FALSE ORDER BY similarity(map_code, $1) DESC LIMIT 1;"
-        res = await itx.client.database.fetch(query, value)
-        if not res or res[0]["map_code"] != value:
+        if not await itx.client.database.map_codes.exists(value, include_archived=False):
             raise errors.NoMapsFoundError
         return value
 
@@ -149,19 +144,11 @@ class CreatorTransformer(app_commands.Transformer):
         else:
             return user.id
 
+    @dispatch_autocomplete()
     async def autocomplete(self, itx: discord.Interaction[core.Genji], current: str) -> list[app_commands.Choice[str]]:
-        query = """
-            WITH creators AS (
-              SELECT u.user_id, nickname FROM users u
-              RIGHT JOIN map_creators mc ON u.user_id = mc.user_id
-            )
-            SELECT DISTINCT nickname, user_id, similarity(nickname, $1::text)
-            FROM creators ORDER BY similarity(nickname, $1::text) DESC LIMIT 6;
-        """
-        results = await itx.client.database.fetch(query, current)
+        results = await itx.client.database.user_search.search(current, 6, view="creators")
         return [
-            app_commands.Choice(name=f"{row['nickname']} ({row['user_id']})", value=str(row["user_id"]))
-            for row in results
+            app_commands.Choice(name=f"{nickname} ({user_id})", value=str(user_id)) for user_id, nickname in results
         ]
 
 
@@ -169,12 +156,11 @@ class AllUserTransformer(app_commands.Transformer):
     async def transform(self, itx: discord.Interaction[core.Genji], value: str) -> utils.FakeUser | discord.Member:
         return await transform_user(itx.client, value)
 
+    @dispatch_autocomplete()
     async def autocomplete(self, itx: discord.Interaction[core.Genji], current: str) -> list[app_commands.Choice[str]]:
-        query = "SELECT user_id, nickname FROM USERS ORDER BY similarity(nickname, $1) DESC LIMIT 10;"
-        results = await itx.client.database.fetch(query, current)
+        results = await itx.client.database.user_search.search(current)
         return [
-            app_commands.Choice(name=f"{row['nickname']} ({row['user_id']})", value=str(row["user_id"]))
-            for row in results
+            app_commands.Choice(name=f"{nickname} ({user_id})", value=str(user_id)) for user_id, nickname in results
         ]
 
 
@@ -185,15 +171,9 @@ class FakeUserTransformer(app_commands.Transformer):
             return user
         raise errors.FakeUserNotFoundError
 
+    @dispatch_autocomplete()
     async def autocomplete(self, itx: discord.Interaction[core.Genji], current: str) -> list[app_commands.Choice[str]]:
-        query = """
-            SELECT user_id, nickname
-            FROM USERS
-            WHERE user_id < 10000000
-            ORDER BY similarity(nickname, $1) DESC
-            LIMIT 10;
-        """
-        results = await itx.client.database.fetch(query, current)
+        results = await itx.client.database.user_search.search(current, view="fake")
         return [app_commands.Choice(name=f"{nick} ({id_})", value=nick) for id_, nick in results]
 
 
@@ -207,16 +187,10 @@ class RecordTransformer(app_commands.Transformer):
 
 class URLTransformer(app_commands.Transformer):
     async def transform(self, itx: discord.Interaction[core.Genji], value: str) -> str:
-        value = value.strip()
-        if not value.startswith("https://") and not value.startswith("http://"):
-            value = "https://" + value
-        try:
-            async with itx.client.session.get(value) as resp:
-                if resp.status != 200:  # noqa: PLR2004
-                    raise errors.IncorrectURLFormatError
-                return str(resp.url)
-        except Exception:
+        url = await itx.client.url_validator.validate(value)
+        if url is None:
             raise errors.IncorrectURLFormatError
+        return url
 
 
 def time_convert(string: str) -> float:
@@ -238,6 +212,7 @@ def time_convert(string: str) -> float:
 class KeyTypeTransformer(app_commands.Transformer):
     """Transform key type."""
 
+    @dispatch_autocomplete()
     async def autocomplete(self, itx: discord.Interaction[core.Genji], current: str) -> list[app_commands.Choice[str]]:
         query = "SELECT name FROM lootbox_key_types ORDER BY similarity(name, $1) DESC LIMIT 5;"
         results = await itx.client.database.fetch(query, current)
@@ -254,20 +229,12 @@ class KeyTypeTransformer(app_commands.Transformer):
 class CommandNameTransformer(app_commands.Transformer):
     """Transform command names."""
 
+    @dispatch_autocomplete()
     async def autocomplete(self, itx: discord.Interaction[core.Genji], current: str) -> list[app_commands.Choice[str]]:
-        query = """
-            SELECT DISTINCT event, similarity(event, $1) as similarity_score
-            FROM analytics ORDER BY similarity_score DESC LIMIT 5;
-        """
-        results = await itx.client.database.fetch(query, current)
-        return [app_commands.Choice(name=row["event"], value=row["event"]) for row in results]
+        results = await itx.client.command_catalog.search(current)
+        return [app_commands.Choice(name=event, value=event) for event in results]
 
     async def transform(self, itx: discord.Interaction[core.Genji], value: str) -> str:
-        query = """
-            SELECT DISTINCT event, similarity(event, $1) as similarity_score
-            FROM analytics ORDER BY similarity_score DESC LIMIT 1;
-        """
-        res = await itx.client.database.fetch(query, value)
-        if not res or res[0]["event"] != value:
+        if not await itx.client.command_catalog.contains(value):
             raise errors.NoMapsFoundError
         return value
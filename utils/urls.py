@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import logging
+import time
+import typing
+
+import aiohttp
+import yarl
+
+log = logging.getLogger(__name__)
+
+MISSING = object()
+
+# Alias host -> canonical host, for the sites guides and records are usually hosted on.
+KNOWN_HOSTS = {
+    "youtube.com": "www.youtube.com",
+    "www.youtube.com": "www.youtube.com",
+    "m.youtube.com": "www.youtube.com",
+    "music.youtube.com": "www.youtube.com",
+    "youtu.be": "youtu.be",
+    "medal.tv": "medal.tv",
+    "www.medal.tv": "medal.tv",
+    "twitch.tv": "www.twitch.tv",
+    "www.twitch.tv": "www.twitch.tv",
+    "m.twitch.tv": "www.twitch.tv",
+    "clips.twitch.tv": "clips.twitch.tv",
+    "streamable.com": "streamable.com",
+    "www.streamable.com": "streamable.com",
+    "imgur.com": "imgur.com",
+    "www.imgur.com": "imgur.com",
+    "i.imgur.com": "i.imgur.com",
+}
+
+# Statuses that mean a host doesn't answer HEAD requests properly, rather than that the URL is broken.
+_HEAD_UNSUPPORTED = frozenset({403, 405, 501})
+
+
+def normalize_url(value: str) -> yarl.URL | None:
+    """Clean up a user supplied URL, or return None if it can't be a web address."""
+    value = value.strip()
+    if not value.startswith(("https://", "http://")):
+        value = "https://" + value
+    try:
+        url = yarl.URL(value)
+    except ValueError:
+        return None
+    if not url.host or "." not in url.host:
+        return None
+    host = url.host.lower().rstrip(".")
+    if (canonical := KNOWN_HOSTS.get(host)) is not None:
+        # Every known host serves https, and the scheme or host alias shouldn't make a separate cache entry.
+        return url.with_scheme("https").with_host(canonical).with_fragment(None)
+    return url.with_host(host).with_fragment(None)
+
+
+class _TTLCache:
+    __slots__ = ("_entries", "max_size")
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: collections.OrderedDict[str, tuple[float, object]] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> object:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: object, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class URLValidator:
+    """Check that user supplied URLs point at something that exists.
+
+    URLs are probed with `HEAD` first, falling back to a `GET` for hosts that don't support
+    `HEAD`. The `GET` only asks for the first `range_bytes` and closes before any of the body is
+    read. Hosts without `HEAD` are remembered, so later probes skip straight to `GET`. Every
+    probe has a strict deadline and at most `max_concurrency` run at once. Results are cached:
+    valid URLs for `ttl` seconds, URLs that answered with an error status for `negative_ttl`
+    seconds. Timeouts and connection errors aren't cached.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        *,
+        ttl: float = 6 * 60 * 60,
+        negative_ttl: float = 5 * 60,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 5.0,
+        range_bytes: int = 64 * 1024,
+        max_concurrency: int = 8,
+        max_cache_size: int = 4096,
+    ) -> None:
+        self.session = session
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.range_bytes = range_bytes
+        self.timeout = aiohttp.ClientTimeout(
+            total=connect_timeout + read_timeout,
+            sock_connect=connect_timeout,
+            sock_read=read_timeout,
+        )
+        self.hits = 0
+        self.misses = 0
+        self._urls = _TTLCache(max_cache_size)
+        self._get_only_hosts = _TTLCache(max_cache_size)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._probes: dict[str, asyncio.Task[str | None]] = {}
+
+    async def validate(self, value: str) -> str | None:
+        """Get the final URL that `value` resolves to, or None if it doesn't resolve to anything."""
+        url = normalize_url(value)
+        if url is None:
+            return None
+        key = str(url)
+        cached = self._urls.get(key)
+        if cached is not MISSING:
+            self.hits += 1
+            return typing.cast("str | None", cached)
+        self.misses += 1
+
+        # Concurrent submissions of the same URL share a probe.
+        task = self._probes.get(key)
+        if task is None:
+            task = asyncio.create_task(self._probe(url))
+            self._probes[key] = task
+            task.add_done_callback(lambda _: self._probes.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _probe(self, url: yarl.URL) -> str | None:
+        key = str(url)
+        try:
+            async with self._semaphore:
+                status, final_url = await self._request(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            log.debug("Probing %s failed: %r", key, e)
+            return None
+
+        if status == 200:  # noqa: PLR2004
+            self._urls.set(key, final_url, self.ttl)
+            return final_url
+        self._urls.set(key, None, self.negative_ttl)
+        return None
+
+    async def _request(self, url: yarl.URL) -> tuple[int, str]:
+        host = url.host or ""
+        if self._get_only_hosts.get(host) is MISSING:
+            async with self.session.head(url, allow_redirects=True, timeout=self.timeout) as resp:
+                if resp.status not in _HEAD_UNSUPPORTED:
+                    return resp.status, str(resp.url)
+            self._get_only_hosts.set(host, True, self.ttl)
+
+        headers = {"Range": f"bytes=0-{self.range_bytes - 1}"}
+        async with self.session.get(url, headers=headers, allow_redirects=True, timeout=self.timeout) as resp:
+            # The body is never needed, so drop the connection rather than draining it.
+            resp.close()
+            # Partial content means the host honoured the range, so it exists just the same.
+            status = 200 if resp.status == 206 else resp.status  # noqa: PLR2004
+            return status, str(resp.url)
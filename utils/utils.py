@@ -66,131 +66,59 @@ def fuzz_multiple(string: str, iterable: typing.Iterable[str]) -> list[str]:
     return values
 
 
-_RANK_THRESHOLD = (10, 10, 10, 10, 7, 3)
-
-
 async def fetch_user_rank_data(
-    db: database.Database, user_id: int, include_archived: bool, include_beginner: bool
+    db: database.Database,
+    user_id: int,
+    include_archived: bool,
+    include_beginner: bool,
+    *,
+    readonly: bool = False,
 ) -> list[RankDetail]:
-    """Fetch user rank data."""
-    query = """
-        WITH unioned_records AS (
-            SELECT DISTINCT ON (map_code, user_id)
-                map_code,
-                user_id,
-                record,
-                screenshot,
-                video,
-                verified,
-                message_id,
-                channel_id,
-                completion,
-                legacy_medal AS medal
-            FROM records
-            ORDER BY map_code, user_id, inserted_at DESC
-        ),
-        ranges AS (
-            SELECT range, name FROM
-            (
-                VALUES
-                    ('[0.0,2.35)'::numrange, 'Easy'),
-                    ('[2.35,4.12)'::numrange, 'Medium'),
-                    ('[4.12,5.88)'::numrange, 'Hard'),
-                    ('[5.88,7.65)'::numrange, 'Very Hard'),
-                    ('[7.65,9.41)'::numrange, 'Extreme'),
-                    ('[9.41,10.0]'::numrange, 'Hell')
-            ) AS ranges("range", "name")
-        ),
-        thresholds AS (
-            -- Mapping difficulty names to thresholds using VALUES
-            SELECT * FROM (
-                VALUES
-                    ('Easy', 10),
-                    ('Medium', 10),
-                    ('Hard', 10),
-                    ('Very Hard', 10),
-                    ('Extreme', 7),
-                    ('Hell', 3)
-            ) AS t(name, threshold)
-        ),
-        map_data AS (
-            SELECT DISTINCT ON (m.map_code, r.user_id)
-                AVG(mr.difficulty) AS difficulty,
-                r.verified = TRUE AND r.video IS NOT NULL AND(
-                    record <= gold OR medal LIKE 'Gold'
-                    ) AS gold,
-                r.verified = TRUE AND r.video IS NOT NULL AND(
-                    record <= silver AND record > gold OR medal LIKE 'Silver'
-                    ) AS silver,
-                r.verified = TRUE AND r.video IS NOT NULL AND(
-                    record <= bronze AND record > silver OR medal LIKE 'Bronze'
-                ) AS bronze
-            FROM unioned_records r
-            LEFT JOIN maps m ON r.map_code = m.map_code
-            LEFT JOIN map_ratings mr ON m.map_code = mr.map_code
-            LEFT JOIN map_medals mm ON r.map_code = mm.map_code
-            WHERE r.user_id = $1
-              AND m.official = TRUE
-              AND ($2 IS TRUE OR m.archived = FALSE)
-            GROUP BY m.map_code, record, gold, silver, bronze, r.verified, medal, r.user_id, r.video
-        ), counts_data AS (
-        SELECT
-            r.name AS difficulty,
-            count(r.name) AS completions,
-            count(CASE WHEN gold THEN 1 END) AS gold,
-            count(CASE WHEN silver THEN 1 END) AS silver,
-            count(CASE WHEN bronze THEN 1 END) AS bronze,
-            -- Use threshold for rank comparison
-            count(r.name) >= t.threshold AS rank_met,
-            count(CASE WHEN gold THEN 1 END) >= t.threshold AS gold_rank_met,
-            count(CASE WHEN silver THEN 1 END) >= t.threshold AS silver_rank_met,
-            count(CASE WHEN bronze THEN 1 END) >= t.threshold AS bronze_rank_met
-        FROM ranges r
-        INNER JOIN map_data md ON r.range @> md.difficulty
-        INNER JOIN thresholds t ON r.name = t.name
-        GROUP BY r.name, t.threshold
-        )
-        SELECT
-            name AS difficulty,
-            coalesce(completions, 0) AS completions,
-            coalesce(gold, 0) AS gold,
-            coalesce(silver, 0) AS silver,
-            coalesce(bronze, 0) AS bronze,
-            coalesce(rank_met, FALSE) AS rank_met,
-            coalesce(gold_rank_met, FALSE) AS gold_rank_met,
-            coalesce(silver_rank_met, FALSE) AS silver_rank_met,
-            coalesce(bronze_rank_met, FALSE) AS bronze_rank_met
-        FROM thresholds t
-        LEFT JOIN counts_data cd ON t.name = cd.difficulty
-        ORDER BY
-        CASE name
-            WHEN 'Easy' THEN 1
-            WHEN 'Medium' THEN 2
-            WHEN 'Hard' THEN 3
-            WHEN 'Very Hard' THEN 4
-            WHEN 'Extreme' THEN 5
-            WHEN 'Hell' THEN 6
-        END;
+    """Fetch user rank data.
+
+    Pass `readonly` only for display; role grants need to see records that were just verified.
     """
-    rows = await db.fetch(query, user_id, include_archived)
+    if include_archived and db.rank_summary.ready:
+        rows = await db.rank_summary.fetch([user_id], readonly=readonly)
+        return [RankDetail(*detail) for _, *detail in rows]
+    rows = await db.fetch_named("user_rank_data", user_id, include_archived, readonly=readonly)
     return [RankDetail(**row) for row in rows]
 
 
+async def fetch_users_rank_data(
+    db: database.Database,
+    user_ids: typing.Sequence[int],
+    include_archived: bool,
+    *,
+    readonly: bool = False,
+) -> dict[int, list[RankDetail]]:
+    """Fetch rank data for many users with a single query."""
+    if include_archived and db.rank_summary.ready:
+        rows = await db.rank_summary.fetch(user_ids, readonly=readonly)
+    else:
+        rows = await db.fetch_named("users_rank_data", list(user_ids), include_archived, readonly=readonly)
+    data: dict[int, list[RankDetail]] = {user_id: [] for user_id in user_ids}
+    for row in rows:
+        user_id, *detail = row
+        data[user_id].append(RankDetail(*detail))
+    return data
+
+
 def determine_skill_rank_roles_to_give(
     data: list[RankDetail],
-    guild: discord.Guild,
+    roles: typing.Mapping[str, discord.Role],
 ) -> tuple[list[discord.Role], list[discord.Role]]:
-    """Determine skill rank roles to give to a member."""
+    """Determine skill rank roles to give to a member, given the guild's roles by name."""
     roles_to_grant = []
     roles_to_remove = []
 
     for row in data:
         base_rank_name = DIFF_TO_RANK[row.difficulty]
-        base_rank = discord.utils.get(guild.roles, name=base_rank_name)
+        base_rank = roles.get(base_rank_name)
 
-        bronze = discord.utils.get(guild.roles, name=f"{base_rank_name} +")
-        silver = discord.utils.get(guild.roles, name=f"{base_rank_name} ++")
-        gold = discord.utils.get(guild.roles, name=f"{base_rank_name} +++")
+        bronze = roles.get(f"{base_rank_name} +")
+        silver = roles.get(f"{base_rank_name} ++")
+        gold = roles.get(f"{base_rank_name} +++")
 
         # Base rank
         if row.rank_met:
@@ -236,6 +164,7 @@ async def grant_skill_rank_roles(
     if set(new_roles) == set(user.roles):
         return
 
+    await bot.role_edits.acquire()
     await user.edit(roles=new_roles)
 
     response = (
@@ -260,20 +189,52 @@ async def grant_skill_rank_roles(
 async def auto_skill_role(bot: core.Genji, guild: discord.Guild, user: discord.Member) -> None:
     """Perform automatic skill roles process."""
     data = await fetch_user_rank_data(bot.database, user.id, True, False)
-    add, remove = determine_skill_rank_roles_to_give(data, guild)
+    add, remove = determine_skill_rank_roles_to_give(data, bot.role_index.for_guild(guild))
     await grant_skill_rank_roles(user, add, remove, bot)
 
 
 async def update_affected_users(client: core.Genji, guild: discord.Guild, map_code: str) -> None:
     """Update roles for users affected by map edits or changes."""
+    await client.database.rank_summary.refresh_map(map_code)
     query = "SELECT DISTINCT user_id FROM records WHERE map_code=$1 AND legacy IS FALSE;"
     rows = await client.database.fetch(query, map_code)
-    ids = [row["user_id"] for row in rows]
+    main_guild = client.get_guild(constants.GUILD_ID)
+    members = [member for row in rows if (member := main_guild.get_member(row["user_id"]))]
+    await bulk_skill_role(client, guild, members)
+
+
+_RANK_BATCH_SIZE = 500
 
-    if ids:
-        for _id in ids:
-            if _user := client.get_guild(constants.GUILD_ID).get_member(_id):
-                await auto_skill_role(client, guild, _user)
+
+async def bulk_skill_role(
+    bot: core.Genji,
+    guild: discord.Guild,
+    members: typing.Sequence[discord.Member],
+    *,
+    concurrency: int = 8,
+) -> None:
+    """Perform the automatic skill roles process for many members.
+
+    Rank data is fetched in batches instead of per member, and role edits run concurrently,
+    paced by the bot's role edit rate limit.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _grant(member: discord.Member, data: list[RankDetail]) -> None:
+        async with semaphore:
+            add, remove = determine_skill_rank_roles_to_give(data, bot.role_index.for_guild(guild))
+            await grant_skill_rank_roles(member, add, remove, bot)
+
+    for start in range(0, len(members), _RANK_BATCH_SIZE):
+        batch = members[start : start + _RANK_BATCH_SIZE]
+        data = await fetch_users_rank_data(bot.database, [member.id for member in batch], True)
+        results = await asyncio.gather(
+            *(_grant(member, data[member.id]) for member in batch),
+            return_exceptions=True,
+        )
+        for member, result in zip(batch, results):
+            if isinstance(result, Exception):
+                log.warning("Couldn't update skill roles for %s: %r", member.id, result)
 
 
 def find_highest_rank(data: list[RankDetail]) -> str:
@@ -343,24 +304,6 @@ def case_ignore_compare(string1: str | None, string2: str | None) -> bool:
     return string2.casefold() in string1.casefold()
 
 
-async def db_records_to_options(
-    db: database.Database, type_: typing.Literal["map_type", "map_name", "mechanics", "restrictions"]
-) -> list[discord.SelectOption]:
-    """Convert database records into SelectMenu options."""
-    if type_ == "map_type":
-        query = "SELECT name FROM all_map_types ORDER BY order_num"
-    elif type_ == "map_name":
-        query = "SELECT name FROM all_map_names ORDER BY name"
-    elif type_ == "mechanics":
-        query = "SELECT name FROM all_map_mechanics ORDER BY order_num"
-    elif type_ == "restrictions":
-        query = "SELECT name FROM all_map_restrictions ORDER BY order_num"
-    else:
-        raise ValueError("Unknown option type.")
-    _records = await db.fetch(query)
-    return [discord.SelectOption(label=r["name"], value=r["name"]) for r in _records]
-
-
 class SettingFlags(enum.IntFlag):
     """Enum Integer Flags for various settings."""
 
@@ -118,12 +118,15 @@ class XPManager:
                 f"[Log into the website to open your lootboxes!](https://genji.pk/lootbox.php)"
             )
 
-    @staticmethod
     async def _update_xp_prestige_roles_for_user(
-        guild: discord.Guild, user_id: int, old_prestige_level: int, new_prestige_level: int,
+        self,
+        guild: discord.Guild,
+        user_id: int,
+        old_prestige_level: int,
+        new_prestige_level: int,
     ) -> None:
-        old_prestige_role = discord.utils.get(guild.roles, name=f"Prestige {old_prestige_level}")
-        new_prestige_role = discord.utils.get(guild.roles, name=f"Prestige {new_prestige_level}")
+        old_prestige_role = self._bot.role_index.get(guild, f"Prestige {old_prestige_level}")
+        new_prestige_role = self._bot.role_index.get(guild, f"Prestige {new_prestige_level}")
         if not (old_prestige_role or new_prestige_role):
             log.info(
                 f"Old prestige level: {old_prestige_level}\n"
@@ -138,12 +141,11 @@ class XPManager:
         roles.add(new_prestige_role)
         await member.edit(roles=roles)
 
-    @staticmethod
     async def _update_xp_roles_for_user(
-        guild: discord.Guild, user_id: int, old_tier_name: str, new_tier_name: str
+        self, guild: discord.Guild, user_id: int, old_tier_name: str, new_tier_name: str
     ) -> None:
-        old_rank = discord.utils.get(guild.roles, name=old_tier_name)
-        new_rank = discord.utils.get(guild.roles, name=new_tier_name)
+        old_rank = self._bot.role_index.get(guild, old_tier_name)
+        new_rank = self._bot.role_index.get(guild, new_tier_name)
         if not (old_rank or new_rank):
             log.info(f"Old tier name: {old_tier_name}\nNew tier name: {new_tier_name}\nUser ID: {user_id}")
             raise ValueError("Can't update xp roles for user.")
@@ -326,7 +326,7 @@ class ConfirmMapSubmission(ConfirmBaseView):
         ]
 
         for type_, select_cls in select_map:
-            options = await utils.db_records_to_options(itx.client.database, type_)
+            options = await itx.client.option_sets.get(type_)
             select = select_cls(options)
             setattr(inst, type_, select)
             inst.add_item(select)
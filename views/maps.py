@@ -188,7 +188,7 @@ class PlaytestVoting(discord.ui.View):
 
     async def check_for_completion(self, itx: discord.Interaction[core.Genji]) -> bool:
         res = bool(
-            await self.client.database.get_row(
+            await self.client.database.fetchrow(
                 "SELECT 1 FROM records WHERE user_id = $1 AND map_code = $2",
                 itx.user.id,
                 self.data.map_code,
@@ -242,7 +242,7 @@ class PlaytestVoting(discord.ui.View):
             attachments=[image],
             view=self,
         )
-        row = await itx.client.database.get_row(
+        row = await itx.client.database.fetchrow(
             "SELECT thread_id FROM playtest WHERE message_id = $1 AND is_author",
             itx.message.id,
         )
@@ -257,7 +257,7 @@ class PlaytestVoting(discord.ui.View):
         await self.check_status(itx, count)
 
     async def get_plot_data(self, itx: discord.Interaction[core.Genji]) -> tuple[int, discord.File]:
-        row = await itx.client.database.get_row(
+        row = await itx.client.database.fetchrow(
             """
                 SELECT AVG(value) as value, SUM(CASE WHEN user_id != $2 THEN 1 ELSE 0 END) as count
                 FROM playtest
@@ -415,7 +415,7 @@ class PlaytestVoting(discord.ui.View):
             print(e)
 
         query = "SELECT verification_id FROM playtest WHERE is_author = TRUE AND map_code = $1;"
-        row = await self.client.database.get_row(query, self.data.map_code)
+        row = await self.client.database.fetchrow(query, self.data.map_code)
         if row.verification_id:
             await (
                 self.client.get_guild(constants.GUILD_ID)
@@ -446,7 +446,7 @@ class PlaytestVoting(discord.ui.View):
         await self.client.database.executemany(query, args)
 
     async def get_author_db_row(self) -> database.DotRecord:
-        return await self.client.database.get_row(
+        return await self.client.database.fetchrow(
             "SELECT * FROM playtest WHERE map_code=$1 AND is_author = TRUE",
             self.data.map_code,
         )
@@ -754,7 +754,7 @@ class PlaytestVoting(discord.ui.View):
             attachments=[image],
             view=self,
         )
-        row = await itx.client.database.get_row(
+        row = await itx.client.database.fetchrow(
             "SELECT thread_id FROM playtest WHERE message_id = $1 AND is_author",
             itx.message.id,
         )
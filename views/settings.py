@@ -56,11 +56,7 @@ class NotificationButton(discord.ui.Button):
         self.view.flags ^= getattr(utils.SettingFlags, self.name.upper())
         self.edit_button(self.name, getattr(utils.SettingFlags, self.name.upper()) in self.view.flags)
         await self.view.itx.edit_original_response(view=self.view)
-        await itx.client.database.execute(
-            "UPDATE users SET flags = $1 WHERE user_id = $2;",
-            self.view.flags,
-            itx.user.id,
-        )
+        await itx.client.database.set_user_flags(itx.user.id, self.view.flags)
 
     def edit_button(self, name: str, value: bool) -> None:
         """Edit button."""
@@ -86,4 +82,6 @@ class NameChangeModal(discord.ui.Modal, title="Change Name"):
             "UPDATE users SET nickname = $1 WHERE user_id = $2;",
             self.name.value[:25],
             itx.user.id,
+            user_ids=(itx.user.id,),
         )
+        itx.client.database.user_search.put(itx.user.id, self.name.value[:25])
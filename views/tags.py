@@ -38,12 +38,9 @@ class TagFuzzView(discord.ui.View):
     async def matches(self, itx: discord.Interaction[core.Genji], select: discord.SelectMenu) -> None:
         """Select menu for tag fuzzy matches."""
         await itx.response.defer()
-        tag = next(
-            x
-            async for x in itx.client.database.get(
-                "SELECT * FROM tags WHERE name=$1",
-                select.values[0],
-            )
+        tag = await itx.client.database.fetchrow(
+            "SELECT * FROM tags WHERE name=$1",
+            select.values[0],
         )
 
         await itx.edit_original_response(content=f"**{tag.name}**\n\n{tag.value}", view=None, embed=None)
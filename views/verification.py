@@ -201,6 +201,7 @@ class VerificationView(discord.ui.View):
             await self._verify_record(itx.client.database, itx.message.id, itx.user.id)
             await self._verify_quality_rating(itx.client.database, search.map_code, record_submitter.id)
             if search.official:
+                await itx.client.database.rank_summary.refresh_users([search.user_id])
                 await utils.auto_skill_role(itx.client, itx.guild, record_submitter)
 
             newsfeed_data = await self._get_record_for_newsfeed(
@@ -298,6 +299,7 @@ class VerificationView(discord.ui.View):
         else:
             data = self.rejected(itx.user.mention, search, rejection)
             await self._remove_record_by_hidden_id(itx.client.database, itx.message.id)
+            await itx.client.database.rank_summary.refresh_users([search.user_id])
 
         await original_message.edit(content=data["edit"])
         flags = await itx.client.database.fetch_user_flags(record_submitter.id)